@@ -0,0 +1,138 @@
+"""
+Typeahead suggestions for the professionals directory.
+
+Professional names, cities, services and region names are normalized like
+search text (accents folded, punctuation dropped) and inserted into a prefix
+trie under every word they contain, so "lucc" finds "Bagni di Lucca" as
+well as "Lucca". Each trie node keeps the ids of its best few suggestions,
+so a lookup is one step per typed character and no ranking at query time.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+from app.data.professionals import PROFESSIONALS
+from app.data.regions import REGIONS
+from app.fulltext import fold
+
+
+# Most suggestions a lookup can return
+MAX_SUGGESTIONS = 10
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Accent-folded lowercase words separated by single spaces."""
+    return _NON_WORD.sub(" ", fold(text)).strip()
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """A completion: what it is, its id and the text to show."""
+    type: str
+    id: str
+    label: str
+    weight: float
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: dict[str, "_Node"] = {}
+        self.top: list[int] = []
+
+
+class PrefixIndex:
+    """
+    Prefix trie over suggestions, best first at every node.
+
+    Suggestions are ranked by weight, then label. Each is reachable from the
+    start of every word of its label and of any extra names given for it.
+    """
+
+    def __init__(self, suggestions: Iterable[tuple[Suggestion, Sequence[str]]], k: int = MAX_SUGGESTIONS):
+        ranked = sorted(suggestions, key=lambda item: (-item[0].weight, item[0].label.lower()))
+        self.suggestions: tuple[Suggestion, ...] = tuple(s for s, _ in ranked)
+        self.root = _Node()
+        self.nodes = 1
+
+        # Inserting in rank order means a node's first k arrivals are its top k
+        for sid, (suggestion, names) in enumerate(ranked):
+            for key in _keys([suggestion.label, *names]):
+                node = self.root
+                for char in key:
+                    child = node.children.get(char)
+                    if child is None:
+                        child = node.children[char] = _Node()
+                        self.nodes += 1
+                    node = child
+                    if len(node.top) < k and sid not in node.top:
+                        node.top.append(sid)
+
+    def lookup(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> list[Suggestion]:
+        """The best suggestions starting with prefix (after normalization)."""
+        node = self.root
+        for char in normalize(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        if node is self.root:
+            return []
+        return [self.suggestions[sid] for sid in node.top[:limit]]
+
+
+def _keys(names: Iterable[str]) -> set[str]:
+    """Each name from each of its words onward."""
+    keys = set()
+    for name in names:
+        words = normalize(name).split()
+        keys.update(" ".join(words[i:]) for i in range(len(words)))
+    return keys
+
+
+def directory_suggestions(
+    professionals: Sequence[dict],
+    regions: dict[str, dict],
+) -> list[tuple[Suggestion, Sequence[str]]]:
+    """
+    Suggestions for the professionals page, with alternative names.
+
+    Cities, services and regions are weighted by how many professionals
+    list them; professionals by being featured and verified.
+    """
+    cities: dict[str, int] = {}
+    services: dict[str, int] = {}
+    region_counts: dict[str, int] = {}
+    for p in professionals:
+        for city in p["cities"]:
+            cities[city] = cities.get(city, 0) + 1
+        for service in p["services"]:
+            services[service] = services.get(service, 0) + 1
+        for region in p["regions"]:
+            region_counts[region] = region_counts.get(region, 0) + 1
+
+    suggestions = [
+        (Suggestion("professional", p["id"], p["name"], 1 + p.get("featured", False) + p.get("verified", False)), ())
+        for p in professionals
+    ]
+    suggestions += [(Suggestion("city", city, city, n), ()) for city, n in cities.items()]
+    suggestions += [(Suggestion("service", service, service, n), ()) for service, n in services.items()]
+    suggestions += [
+        (Suggestion("region", region_id, region["name_en"], region_counts.get(region_id, 0)), (region["name_it"],))
+        for region_id, region in regions.items()
+    ]
+    return suggestions
+
+
+_index: Optional[PrefixIndex] = None
+
+
+def get_autocomplete() -> PrefixIndex:
+    """The directory prefix index, built on first use."""
+    global _index
+    if _index is None:
+        _index = PrefixIndex(directory_suggestions(PROFESSIONALS, REGIONS))
+    return _index
@@ -2,7 +2,7 @@
 Core calculation logic for Italian property purchase costs.
 """
 
-from typing import Optional
+from typing import Iterable, Optional
 from app.models import (
     PropertyInput,
     CalculationResult,
@@ -11,21 +11,11 @@ from app.models import (
 )
 from app.data.rates import (
     CADASTRAL_MULTIPLIERS,
-    REGISTRATION_TAX,
-    VAT_RATES,
     LUXURY_CATEGORIES,
-    MORTGAGE_TAX,
-    CADASTRAL_TAX,
-    NOTARY_FEE_SCHEDULE,
-    AGENCY_COMMISSION,
-    PROFESSIONAL_FEES,
-    MORTGAGE_FEES,
-    CURRENCY_CONVERSION_SPREAD,
-    IMU_RATES,
-    TARI_RATES,
-    UTILITY_ESTIMATES,
 )
-from app.currency import convert_currency
+from app.cache import TTLCache
+from app.schedules import NOTARY_FEES
+from app.plans import get_plan
 
 
 def calculate_cadastral_value(
@@ -48,21 +38,7 @@ def calculate_cadastral_value(
 
 def calculate_notary_fee(purchase_price: float) -> float:
     """Calculate notary fee based on sliding scale."""
-    for max_price, base_fee, rate in NOTARY_FEE_SCHEDULE:
-        if purchase_price <= max_price:
-            # Find the previous threshold
-            prev_threshold = 0
-            for mp, bf, _ in NOTARY_FEE_SCHEDULE:
-                if mp < max_price:
-                    prev_threshold = mp
-                else:
-                    break
-
-            excess = purchase_price - prev_threshold
-            return base_fee + (excess * rate)
-
-    # Fallback for very high values
-    return 12000 + (purchase_price - 1000000) * 0.005
+    return NOTARY_FEES(purchase_price)
 
 
 def is_luxury_property(cadastral_category: Optional[str]) -> bool:
@@ -83,202 +59,8 @@ def calculate_one_time_costs(
     Returns:
         Tuple of (list of cost items, list of notes)
     """
-    items = []
-    notes = []
-    is_luxury = is_luxury_property(prop.cadastral_category)
-
-    # Registration Tax / VAT
-    if prop.seller_type.value == "developer":
-        # Fixed registration tax
-        items.append(CostItem(
-            name="Registration Tax (Imposta di Registro)",
-            amount_eur=REGISTRATION_TAX["from_developer"],
-            description="Fixed fee when buying from developer"
-        ))
-
-        # VAT on purchase price
-        if is_luxury:
-            vat_rate = VAT_RATES["luxury"]
-            vat_desc = "22% VAT on luxury property"
-        elif prop.prima_casa:
-            vat_rate = VAT_RATES["prima_casa"]
-            vat_desc = "4% VAT (prima casa rate)"
-        else:
-            vat_rate = VAT_RATES["second_home"]
-            vat_desc = "10% VAT (second home rate)"
-
-        vat_amount = prop.purchase_price * vat_rate
-        items.append(CostItem(
-            name="VAT (IVA)",
-            amount_eur=vat_amount,
-            description=vat_desc
-        ))
-        notes.append(f"VAT applies because purchasing from developer/company")
-
-        # Fixed mortgage and cadastral tax
-        items.append(CostItem(
-            name="Mortgage Tax (Imposta Ipotecaria)",
-            amount_eur=MORTGAGE_TAX["from_developer"],
-            description="Fixed fee when buying from developer"
-        ))
-        items.append(CostItem(
-            name="Cadastral Tax (Imposta Catastale)",
-            amount_eur=CADASTRAL_TAX["from_developer"],
-            description="Fixed fee when buying from developer"
-        ))
-
-    else:  # Private seller
-        # Registration tax based on cadastral value
-        if prop.prima_casa:
-            reg_tax = max(cadastral_value * REGISTRATION_TAX["prima_casa_private"], 1000)
-            reg_desc = "2% of cadastral value (prima casa rate, min €1,000)"
-        else:
-            reg_tax = cadastral_value * REGISTRATION_TAX["second_home_private"]
-            reg_desc = "9% of cadastral value (second home rate)"
-
-        items.append(CostItem(
-            name="Registration Tax (Imposta di Registro)",
-            amount_eur=reg_tax,
-            description=reg_desc
-        ))
-        notes.append(f"Registration tax calculated on cadastral value (€{cadastral_value:,.0f}), not purchase price")
-
-        # Mortgage tax
-        if prop.prima_casa:
-            items.append(CostItem(
-                name="Mortgage Tax (Imposta Ipotecaria)",
-                amount_eur=MORTGAGE_TAX["prima_casa_private"],
-                description="Fixed €50 for prima casa"
-            ))
-        else:
-            mort_tax = cadastral_value * MORTGAGE_TAX["second_home_private"]
-            items.append(CostItem(
-                name="Mortgage Tax (Imposta Ipotecaria)",
-                amount_eur=mort_tax,
-                description="2% of cadastral value"
-            ))
-
-        # Cadastral tax
-        if prop.prima_casa:
-            items.append(CostItem(
-                name="Cadastral Tax (Imposta Catastale)",
-                amount_eur=CADASTRAL_TAX["prima_casa_private"],
-                description="Fixed €50 for prima casa"
-            ))
-        else:
-            cad_tax = cadastral_value * CADASTRAL_TAX["second_home_private"]
-            items.append(CostItem(
-                name="Cadastral Tax (Imposta Catastale)",
-                amount_eur=cad_tax,
-                description="1% of cadastral value"
-            ))
-
-    # Notary fees
-    notary_fee = calculate_notary_fee(prop.purchase_price)
-    items.append(CostItem(
-        name="Notary Fees",
-        amount_eur=notary_fee,
-        description="Based on purchase price, includes deed and searches",
-        is_estimate=True
-    ))
-
-    # Agency commission
-    if prop.include_agency_fee:
-        agency_rate = prop.agency_rate or AGENCY_COMMISSION["rate"]
-        commission_base = prop.purchase_price * agency_rate
-        commission_vat = commission_base * AGENCY_COMMISSION["vat_rate"]
-        commission_total = commission_base + commission_vat
-        items.append(CostItem(
-            name="Agency Commission",
-            amount_eur=commission_total,
-            description=f"{agency_rate*100:.0f}% + 22% VAT = {(agency_rate * 1.22)*100:.2f}% effective",
-            is_estimate=True
-        ))
-
-    # Geometra/surveyor
-    if prop.include_geometra:
-        items.append(CostItem(
-            name="Geometra (Surveyor)",
-            amount_eur=PROFESSIONAL_FEES["geometra_default"],
-            description="Technical verification and documentation",
-            is_estimate=True
-        ))
-
-    # Technical reports
-    items.append(CostItem(
-        name="Technical Reports",
-        amount_eur=PROFESSIONAL_FEES["technical_reports_default"],
-        description="Energy certificate, property checks",
-        is_estimate=True
-    ))
-
-    # Translator
-    if prop.include_translator:
-        items.append(CostItem(
-            name="Translator",
-            amount_eur=PROFESSIONAL_FEES["translator_default"],
-            description="For deed signing if needed",
-            is_estimate=True
-        ))
-
-    # Mortgage-related costs
-    if prop.using_mortgage:
-        mortgage_amount = prop.mortgage_amount or (prop.purchase_price * 0.7)
-
-        items.append(CostItem(
-            name="Bank Fees",
-            amount_eur=MORTGAGE_FEES["bank_fee_default"],
-            description="Mortgage arrangement fee",
-            is_estimate=True
-        ))
-
-        if prop.prima_casa:
-            mort_reg_tax = mortgage_amount * MORTGAGE_FEES["registration_tax_prima_casa"]
-            mort_desc = "0.25% of mortgage amount (prima casa rate)"
-        else:
-            mort_reg_tax = mortgage_amount * MORTGAGE_FEES["registration_tax_second_home"]
-            mort_desc = "2% of mortgage amount"
-
-        items.append(CostItem(
-            name="Mortgage Registration Tax",
-            amount_eur=mort_reg_tax,
-            description=mort_desc
-        ))
-
-        items.append(CostItem(
-            name="Property Valuation",
-            amount_eur=MORTGAGE_FEES["valuation_fee_default"],
-            description="Bank's property assessment",
-            is_estimate=True
-        ))
-
-    # Currency conversion cost
-    if prop.source_currency.value != "EUR":
-        conversion_cost = prop.purchase_price * CURRENCY_CONVERSION_SPREAD["default"]
-        items.append(CostItem(
-            name="Currency Transfer Cost",
-            amount_eur=conversion_cost,
-            description=f"~{CURRENCY_CONVERSION_SPREAD['default']*100:.0f}% spread estimate",
-            is_estimate=True
-        ))
-        notes.append("Currency transfer cost varies by provider. Specialist services may offer better rates than banks.")
-
-    # Renovation costs (if any)
-    if prop.renovation_budget:
-        items.append(CostItem(
-            name="Renovation Budget",
-            amount_eur=prop.renovation_budget,
-            description="User-specified renovation amount"
-        ))
-
-    # Convert to foreign currency
-    if prop.source_currency.value != "EUR":
-        for item in items:
-            item.amount_foreign = convert_currency(
-                item.amount_eur, "EUR", prop.source_currency.value, rates
-            )
-
-    return items, notes
+    items, notes = get_plan(prop).evaluate_one_time(prop, cadastral_value)
+    return _project_items(items, _exchange_rate(prop.source_currency, rates)), notes
 
 
 def calculate_annual_costs(
@@ -292,95 +74,17 @@ def calculate_annual_costs(
     Returns:
         Tuple of (list of cost items, list of notes)
     """
-    items = []
-    notes = []
-    is_luxury = is_luxury_property(prop.cadastral_category)
-    property_size = prop.property_size_sqm or 100  # Default 100 sqm if not specified
-
-    # IMU (Property Tax)
-    if prop.prima_casa and not is_luxury:
-        items.append(CostItem(
-            name="IMU (Property Tax)",
-            amount_eur=0,
-            description="Exempt for prima casa (main residence)"
-        ))
-        notes.append("Primary residence is exempt from IMU (except luxury categories A/1, A/8, A/9)")
-    else:
-        if prop.prima_casa and is_luxury:
-            imu_rate = IMU_RATES["prima_casa_luxury"]
-            imu_desc = "0.5% of cadastral value (luxury main residence)"
-        else:
-            imu_rate = IMU_RATES["second_home_default"]
-            imu_desc = f"~{imu_rate*100:.2f}% of cadastral value (varies by municipality)"
-
-        imu_amount = cadastral_value * imu_rate
-        items.append(CostItem(
-            name="IMU (Property Tax)",
-            amount_eur=imu_amount,
-            description=imu_desc,
-            is_estimate=True
-        ))
-        notes.append("IMU rate varies by municipality (0.76% - 1.06%). Using typical rate of 0.86%")
-
-    # TARI (Waste Tax)
-    tari_amount = property_size * TARI_RATES["default_per_sqm"]
-    items.append(CostItem(
-        name="TARI (Waste Tax)",
-        amount_eur=tari_amount,
-        description=f"~€{TARI_RATES['default_per_sqm']}/sqm/year estimate for {property_size:.0f}sqm",
-        is_estimate=True
-    ))
-
-    # Condominium fees
-    if prop.is_apartment:
-        if prop.monthly_condo_fee:
-            annual_condo = prop.monthly_condo_fee * 12
-            items.append(CostItem(
-                name="Condominium Fees",
-                amount_eur=annual_condo,
-                description=f"€{prop.monthly_condo_fee:.0f}/month × 12"
-            ))
-        else:
-            # Estimate based on size
-            monthly_estimate = 100 + (property_size * 0.5)
-            annual_condo = monthly_estimate * 12
-            items.append(CostItem(
-                name="Condominium Fees",
-                amount_eur=annual_condo,
-                description=f"Estimated ~€{monthly_estimate:.0f}/month",
-                is_estimate=True
-            ))
-            notes.append("Condominium fees vary widely by building and services. Verify with seller.")
-
-    # Utilities estimate
-    utilities = property_size * UTILITY_ESTIMATES["total_per_sqm"]
-    items.append(CostItem(
-        name="Utilities (Estimate)",
-        amount_eur=utilities,
-        description=f"Electricity, gas, water for {property_size:.0f}sqm",
-        is_estimate=True
-    ))
-
-    # Convert to foreign currency
-    if prop.source_currency.value != "EUR":
-        for item in items:
-            item.amount_foreign = convert_currency(
-                item.amount_eur, "EUR", prop.source_currency.value, rates
-            )
-
-    return items, notes
+    items, notes = get_plan(prop).evaluate_annual(prop, cadastral_value)
+    return _project_items(items, _exchange_rate(prop.source_currency, rates)), notes
 
 
-def calculate_total(prop: PropertyInput, rates: dict[str, float]) -> CalculationResult:
+def calculate_base(prop: PropertyInput) -> CalculationResult:
     """
-    Perform complete cost calculation.
-
-    Args:
-        prop: Property input parameters
-        rates: Exchange rates dictionary
+    Perform the complete cost calculation in EUR only.
 
-    Returns:
-        Complete calculation result
+    Foreign amounts are left empty; use project_result() to fill them for a
+    currency. The result only depends on whether the source currency is EUR,
+    not on which foreign currency it is, or on exchange rates.
     """
     # Calculate cadastral value
     cadastral_value = calculate_cadastral_value(
@@ -390,30 +94,16 @@ def calculate_total(prop: PropertyInput, rates: dict[str, float]) -> Calculation
     )
 
     # Calculate costs
-    one_time_items, one_time_notes = calculate_one_time_costs(prop, cadastral_value, rates)
-    annual_items, annual_notes = calculate_annual_costs(prop, cadastral_value, rates)
+    plan = get_plan(prop)
+    one_time_items, one_time_notes = plan.evaluate_one_time(prop, cadastral_value)
+    annual_items, annual_notes = plan.evaluate_annual(prop, cadastral_value)
 
     # Calculate subtotals
     one_time_total_eur = sum(item.amount_eur for item in one_time_items)
     annual_total_eur = sum(item.amount_eur for item in annual_items)
 
-    # Foreign currency totals
-    one_time_total_foreign = None
-    annual_total_foreign = None
-    purchase_price_foreign = None
-    exchange_rate = None
-
-    if prop.source_currency.value != "EUR":
-        exchange_rate = rates.get(prop.source_currency.value, 1.0)
-        purchase_price_foreign = prop.purchase_price * exchange_rate
-        one_time_total_foreign = one_time_total_eur * exchange_rate
-        annual_total_foreign = annual_total_eur * exchange_rate
-
     # Grand total first year
     grand_total_eur = prop.purchase_price + one_time_total_eur + annual_total_eur
-    grand_total_foreign = None
-    if purchase_price_foreign:
-        grand_total_foreign = grand_total_eur * exchange_rate
 
     # Percentage calculation
     one_time_percentage = (one_time_total_eur / prop.purchase_price) * 100
@@ -423,14 +113,12 @@ def calculate_total(prop: PropertyInput, rates: dict[str, float]) -> Calculation
         name="One-Time Purchase Costs",
         items=one_time_items,
         subtotal_eur=one_time_total_eur,
-        subtotal_foreign=one_time_total_foreign
     )
 
     annual_category = CostCategory(
         name="Ongoing Annual Costs",
         items=annual_items,
         subtotal_eur=annual_total_eur,
-        subtotal_foreign=annual_total_foreign
     )
 
     # Combine notes
@@ -441,9 +129,7 @@ def calculate_total(prop: PropertyInput, rates: dict[str, float]) -> Calculation
 
     return CalculationResult(
         purchase_price_eur=prop.purchase_price,
-        purchase_price_foreign=purchase_price_foreign,
-        source_currency=prop.source_currency.value,
-        exchange_rate=exchange_rate,
+        source_currency=prop.source_currency,
         property_type=prop.property_type.value,
         is_prima_casa=prop.prima_casa,
         seller_type=prop.seller_type.value,
@@ -451,11 +137,139 @@ def calculate_total(prop: PropertyInput, rates: dict[str, float]) -> Calculation
         one_time_costs=one_time_category,
         ongoing_annual_costs=annual_category,
         total_one_time_eur=one_time_total_eur,
-        total_one_time_foreign=one_time_total_foreign,
         total_annual_eur=annual_total_eur,
-        total_annual_foreign=annual_total_foreign,
         grand_total_first_year_eur=grand_total_eur,
-        grand_total_first_year_foreign=grand_total_foreign,
         one_time_percentage=one_time_percentage,
         notes=all_notes
     )
+
+
+def _exchange_rate(currency: str, rates: dict[str, float]) -> Optional[float]:
+    """EUR -> currency rate, or None when no conversion is needed."""
+    if currency == "EUR":
+        return None
+    return rates.get(currency, 1.0)
+
+
+def _project_items(items: list[CostItem], exchange_rate: Optional[float]) -> list[CostItem]:
+    """Copy items with foreign amounts filled in (items may be shared)."""
+    if exchange_rate is None:
+        return items
+    return [
+        item.model_copy(update={"amount_foreign": item.amount_eur * exchange_rate})
+        for item in items
+    ]
+
+
+def _project_category(category: CostCategory, exchange_rate: Optional[float]) -> CostCategory:
+    return category.model_copy(update={
+        "items": _project_items(category.items, exchange_rate),
+        "subtotal_foreign": category.subtotal_eur * exchange_rate if exchange_rate is not None else None,
+    })
+
+
+def project_result(
+    result: CalculationResult,
+    currency: str,
+    rates: dict[str, float]
+) -> CalculationResult:
+    """
+    Project an EUR calculation into a display currency.
+
+    Only multiplies by one exchange rate; no rules are re-evaluated.
+    """
+    exchange_rate = _exchange_rate(currency, rates)
+    if exchange_rate is None:
+        return result.model_copy(update={"source_currency": currency})
+
+    purchase_price_foreign = result.purchase_price_eur * exchange_rate
+    return result.model_copy(update={
+        "source_currency": currency,
+        "exchange_rate": exchange_rate,
+        "purchase_price_foreign": purchase_price_foreign,
+        "one_time_costs": _project_category(result.one_time_costs, exchange_rate),
+        "ongoing_annual_costs": _project_category(result.ongoing_annual_costs, exchange_rate),
+        "total_one_time_foreign": result.total_one_time_eur * exchange_rate,
+        "total_annual_foreign": result.total_annual_eur * exchange_rate,
+        "grand_total_first_year_foreign": (
+            result.grand_total_first_year_eur * exchange_rate if purchase_price_foreign else None
+        ),
+    })
+
+
+def calculate_total(prop: PropertyInput, rates: dict[str, float]) -> CalculationResult:
+    """
+    Perform complete cost calculation.
+
+    Args:
+        prop: Property input parameters
+        rates: Exchange rates dictionary
+
+    Returns:
+        Complete calculation result
+    """
+    return project_result(calculate_base(prop), prop.source_currency, rates)
+
+
+# EUR results keyed on canonical input. They do not depend on exchange rates,
+# so they survive rate refreshes. Cached results are shared between requests
+# and must be treated as read-only. TTLCache has no locking, so only use this
+# cache from async endpoints on the event loop, never from threadpool (def) ones.
+_result_cache = TTLCache(maxsize=2048, ttl=900)
+
+
+def canonical_input(prop: PropertyInput) -> tuple:
+    """
+    Hashable form of a PropertyInput for EUR calculations.
+
+    Inputs the calculator treats identically map to the same key: missing
+    and zero optional amounts, cadastral categories that only differ in
+    case or luxury status, and different foreign source currencies.
+    """
+    data = prop.model_dump(mode="json")
+    data["cadastral_category"] = is_luxury_property(prop.cadastral_category)
+    data["source_currency"] = data["source_currency"] != "EUR"
+    for field in (
+        "cadastral_income", "mortgage_amount", "renovation_budget",
+        "agency_rate", "property_size_sqm", "monthly_condo_fee",
+    ):
+        data[field] = data[field] or None
+    return tuple(sorted(data.items()))
+
+
+def calculate_base_cached(prop: PropertyInput) -> CalculationResult:
+    """Memoized calculate_base."""
+    key = canonical_input(prop)
+    result = _result_cache.get(key)
+    if result is None:
+        result = calculate_base(prop)
+        _result_cache.put(key, result)
+    return result
+
+
+def calculate_total_cached(prop: PropertyInput, rates: dict[str, float]) -> CalculationResult:
+    """calculate_total backed by the EUR result cache."""
+    return project_result(calculate_base_cached(prop), prop.source_currency, rates)
+
+
+def calculate_all_currencies(
+    prop: PropertyInput,
+    rates: dict[str, float],
+    currencies: Iterable[str]
+) -> dict[str, CalculationResult]:
+    """
+    Results for each of currencies, as calculate_total would return them.
+
+    At most two EUR calculations are needed (domestic and foreign, which
+    differ by the currency transfer cost); every currency is a projection.
+    """
+    results = {}
+    for currency in currencies:
+        base = calculate_base_cached(prop.model_copy(update={"source_currency": currency}))
+        results[currency] = project_result(base, currency, rates)
+    return results
+
+
+def get_result_cache_stats() -> dict:
+    """Return hit/miss/eviction counters for the result cache."""
+    return _result_cache.stats()
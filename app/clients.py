@@ -0,0 +1,116 @@
+"""
+Shared outbound HTTP clients.
+
+One long-lived httpx.AsyncClient per upstream service, so connections
+(and their DNS, TCP and TLS setup) are reused across requests instead of
+being rebuilt on every call. Clients are opened in the application lifespan
+and closed on shutdown. HTTP/2 is used when the optional h2 package is
+installed.
+"""
+
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import Optional
+
+import httpx
+
+
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class ServiceConfig:
+    """Connection pool and timeout settings for one upstream service."""
+    timeout: float
+    connect_timeout: float = 5.0
+    max_connections: int = 10
+    max_keepalive_connections: int = 5
+    keepalive_expiry: float = 30.0
+
+
+SERVICES = {
+    "frankfurter": ServiceConfig(timeout=10.0, max_connections=4, max_keepalive_connections=2),
+    "listings": ServiceConfig(timeout=15.0, max_connections=20, max_keepalive_connections=10),
+    "translator": ServiceConfig(timeout=30.0, max_connections=10, max_keepalive_connections=5),
+}
+
+
+class ClientRegistry:
+    """
+    Lazily created, pooled clients keyed by service name.
+
+    Each client has its own pool, so the limits in ServiceConfig apply per
+    upstream host.
+    """
+
+    def __init__(self, services: dict[str, ServiceConfig] = SERVICES):
+        self.services = services
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._requests: dict[str, int] = {name: 0 for name in services}
+
+    def open(self) -> None:
+        """Create a client for every configured service."""
+        for name in self.services:
+            self.get(name)
+
+    def get(self, service: str) -> httpx.AsyncClient:
+        """Return the pooled client for service, creating it on first use."""
+        client = self._clients.get(service)
+        if client is None or client.is_closed:
+            client = self._create(service)
+            self._clients[service] = client
+        return client
+
+    def _create(self, service: str) -> httpx.AsyncClient:
+        config = self.services[service]
+
+        async def count_request(request: httpx.Request) -> None:
+            self._requests[service] += 1
+
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            http2=HTTP2_AVAILABLE,
+            event_hooks={"request": [count_request]},
+        )
+
+    async def aclose(self) -> None:
+        """Close every client and its connections."""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def stats(self) -> dict:
+        """Per-service request counts and pool utilization."""
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "services": {
+                name: {
+                    "open": name in self._clients and not self._clients[name].is_closed,
+                    "requests": self._requests[name],
+                    "max_connections": config.max_connections,
+                    **_pool_usage(self._clients.get(name)),
+                }
+                for name, config in self.services.items()
+            },
+        }
+
+
+def _pool_usage(client: Optional[httpx.AsyncClient]) -> dict:
+    """Open, idle and active connections in a client's pool (zero if unknown)."""
+    # httpx does not expose its pool; read httpcore's connection list if present
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    idle = sum(1 for c in connections if c.is_idle())
+    return {
+        "connections": len(connections),
+        "idle_connections": idle,
+        "active_connections": len(connections) - idle,
+    }
+
+
+clients = ClientRegistry()
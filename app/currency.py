@@ -1,59 +1,509 @@
 """
-Currency exchange rate service using Frankfurter API (free, no API key needed).
+Currency exchange rate service, backed by Frankfurter API (free, no API key needed)
+by default or another provider from app/providers.py.
 """
 
 import httpx
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Mapping, Optional
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from functools import lru_cache
+from types import MappingProxyType
 import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from pathlib import Path
 
+from app.cache import TTLCache
+from app.circuit import CircuitBreaker
+from app.fx import CrossRates
+from app.providers import RateProvider, provider_from_env
 
-# Cache for exchange rates
-_rate_cache: dict = {}
-_cache_timestamp: Optional[datetime] = None
+
+# Rates younger than this are served without refreshing
 CACHE_DURATION = timedelta(minutes=15)
 
 
-async def fetch_exchange_rates(base: str = "EUR") -> dict[str, float]:
+@dataclass(frozen=True)
+class RefreshConfig:
+    """
+    Background refresh settings, in seconds.
+
+    Rates older than CACHE_DURATION but younger than max_staleness are still
+    served immediately while a refresh runs in the background.
+    """
+    interval: float = 600.0
+    max_staleness: float = 3600.0
+    jitter: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "RefreshConfig":
+        """Read RATE_REFRESH_INTERVAL, RATE_MAX_STALENESS and RATE_REFRESH_JITTER."""
+        defaults = cls()
+        return cls(
+            interval=float(os.environ.get("RATE_REFRESH_INTERVAL", defaults.interval)),
+            max_staleness=float(os.environ.get("RATE_MAX_STALENESS", defaults.max_staleness)),
+            jitter=float(os.environ.get("RATE_REFRESH_JITTER", defaults.jitter)),
+        )
+
+
+REFRESH_CONFIG = RefreshConfig.from_env()
+
+# Last successful snapshots, persisted so restarts and new workers start warm
+SNAPSHOT_PATH = Path(os.environ.get(
+    "RATE_SNAPSHOT_PATH",
+    Path(__file__).resolve().parent.parent / "var" / "exchange_rates.json",
+))
+
+# Where fresh rates come from; see app/providers.py for RATE_PROVIDER values
+_provider: RateProvider = provider_from_env()
+
+
+def get_provider() -> RateProvider:
+    return _provider
+
+
+def set_provider(provider: RateProvider) -> None:
+    """Replace the rate provider, e.g. with a fake in tests or benchmarks."""
+    global _provider
+    _provider = provider
+
+
+# Versions of published snapshots, shared by every base so they never repeat
+_versions = itertools.count(1)
+
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    """
+    Immutable exchange rates for one base currency.
+
+    A refresh publishes a new snapshot rather than changing the current one,
+    so a reader always sees rates, timestamp and cross-rate matrix that
+    belong together. version grows with every published snapshot; downstream
+    caches can key on it. Fallback rates have version 0 and no fetched_at.
+    """
+    base: str
+    rates: Mapping[str, float]
+    fetched_at: Optional[datetime]
+    source: str
+    version: int
+    cross: CrossRates
+
+    @classmethod
+    def create(
+        cls,
+        base: str,
+        rates: Mapping[str, float],
+        fetched_at: Optional[datetime],
+        source: str,
+        version: Optional[int] = None
+    ) -> "RateSnapshot":
+        """Freeze rates into a snapshot, taking the next version unless one is given."""
+        rates = dict(rates)
+        return cls(
+            base=base,
+            rates=MappingProxyType(rates),
+            fetched_at=fetched_at,
+            source=source,
+            version=next(_versions) if version is None else version,
+            cross=CrossRates.from_rates(rates, base),
+        )
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        """Seconds since the rates were fetched, or None for fallback rates."""
+        if self.fetched_at is None:
+            return None
+        return (datetime.now(timezone.utc) - self.fetched_at).total_seconds()
+
+    @property
+    def stale(self) -> bool:
+        age = self.age_seconds
+        return age is None or age >= CACHE_DURATION.total_seconds()
+
+    def rebased(self, base: str) -> "RateSnapshot":
+        """The same rates seen from another currency in them, keeping the version."""
+        return RateSnapshot.create(
+            base,
+            self.cross.row(base),
+            self.fetched_at,
+            self.source,
+            version=self.version,
+        )
+
+
+# Current snapshot per base currency. Entries are only ever replaced whole,
+# so readers never need a lock.
+_snapshots: dict[str, RateSnapshot] = {}
+
+
+def _publish(snapshot: RateSnapshot) -> None:
+    """Swap in snapshot for its base."""
+    _snapshots[snapshot.base] = snapshot
+
+
+@lru_cache(maxsize=None)
+def _fallback_snapshot(base: str) -> RateSnapshot:
+    return RateSnapshot.create(base, get_fallback_rates(base), None, "fallback", version=0)
+
+
+# In-flight upstream fetches per base currency, shared by concurrent misses
+_inflight: dict[str, asyncio.Task] = {}
+_fetch_stats = {
+    "upstream_fetches": 0,
+    "upstream_errors": 0,
+    "coalesced_waiters": 0,
+    "stale_served": 0,
+    "short_circuited": 0,
+}
+
+# Stop calling the provider after repeated failures, and remember a failed
+# base for a few seconds so callers don't each wait out the timeout
+_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+NEGATIVE_CACHE_TTL = 5.0
+_recent_failures = TTLCache(maxsize=64, ttl=NEGATIVE_CACHE_TTL)
+
+
+class UpstreamUnavailable(httpx.HTTPError):
+    """Raised without contacting the provider while the circuit is open or a failure is cached."""
+
+
+async def _fetch_from_upstream(base: str) -> RateSnapshot:
+    """Fetch rates from the provider and publish a snapshot. Raises httpx.HTTPError."""
+    _fetch_stats["upstream_fetches"] += 1
+
+    try:
+        rates = await _provider.fetch(base)
+    except Exception as e:
+        _fetch_stats["upstream_errors"] += 1
+        _breaker.record_failure()
+        _recent_failures.put(base, str(e) or type(e).__name__)
+        raise
+
+    _breaker.record_success()
+
+    snapshot = RateSnapshot.create(base, rates, datetime.now(timezone.utc), _provider.name)
+    _publish(snapshot)
+    save_rate_snapshot()
+
+    return snapshot
+
+
+def save_rate_snapshot(path: Path = SNAPSHOT_PATH) -> None:
+    """
+    Write the current snapshots to path atomically.
+
+    The file is written to a temporary file in the same directory and
+    renamed over the old one, so readers never see a partial file. Versions
+    are per process and are not saved.
+    """
+    if not _snapshots:
+        return
+    data = {
+        "snapshots": {
+            base: {
+                "fetched_at": snapshot.fetched_at.isoformat(),
+                "source": snapshot.source,
+                "rates": dict(snapshot.rates),
+            }
+            for base, snapshot in _snapshots.items()
+        },
+    }
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Could not save exchange rate snapshot: {e}")
+
+
+def _parse_timestamp(value: str) -> datetime:
+    fetched_at = datetime.fromisoformat(value)
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.astimezone()
+    return fetched_at.astimezone(timezone.utc)
+
+
+def load_rate_snapshot(path: Path = SNAPSHOT_PATH) -> bool:
+    """
+    Publish the snapshots saved in path, keeping their original timestamps.
+
+    Returns True if any snapshot was loaded. Missing or unreadable files are
+    ignored, and a saved snapshot never replaces a newer one for its base.
+    Files in the older single-timestamp format are read too.
+    """
+    try:
+        data = json.loads(path.read_text())
+        if "snapshots" in data:
+            saved = data["snapshots"]
+        else:
+            saved = {
+                base: {"fetched_at": data["fetched_at"], "source": data.get("source", "unknown"), "rates": rates}
+                for base, rates in data["rates"].items()
+            }
+        loaded = [
+            (
+                base,
+                {code: float(rate) for code, rate in entry["rates"].items()},
+                _parse_timestamp(entry["fetched_at"]),
+                entry.get("source", "unknown"),
+            )
+            for base, entry in saved.items()
+        ]
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"Ignoring unreadable exchange rate snapshot {path}: {e}")
+        return False
+
+    published = False
+    for base, rates, fetched_at, source in loaded:
+        current = _snapshots.get(base)
+        if current is not None and current.fetched_at >= fetched_at:
+            continue
+        _publish(RateSnapshot.create(base, rates, fetched_at, source))
+        published = True
+    return published
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    # Avoid "exception was never retrieved" when every waiter was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+def _start_fetch(base: str) -> asyncio.Task:
+    """
+    Return the in-flight fetch task for base, starting one if needed.
+
+    Raises UpstreamUnavailable when a new fetch is not allowed.
+    """
+    task = _inflight.get(base)
+    if task is None:
+        if _recent_failures.get(base) is not None or not _breaker.allow():
+            _fetch_stats["short_circuited"] += 1
+            raise UpstreamUnavailable(f"Exchange rate upstream unavailable for {base}")
+        task = asyncio.ensure_future(_fetch_from_upstream(base))
+        task.add_done_callback(_consume_exception)
+        task.add_done_callback(lambda t: _inflight.pop(base, None))
+        _inflight[base] = task
+    return task
+
+
+async def _single_flight(base: str) -> RateSnapshot:
+    """
+    Join the in-flight fetch for base, or start one.
+
+    Concurrent callers share one upstream request and its result or error.
+    The fetch runs as its own task, so a cancelled caller does not cancel it
+    for the others.
+    """
+    if base in _inflight:
+        _fetch_stats["coalesced_waiters"] += 1
+    return await asyncio.shield(_start_fetch(base))
+
+
+def _snapshot_age(base: str) -> Optional[float]:
+    """Seconds since rates for base were fetched, or None if they never were."""
+    snapshot = _snapshots.get(base)
+    return snapshot.age_seconds if snapshot is not None else None
+
+
+def _last_known_good(base: str) -> RateSnapshot:
+    """
+    The snapshot for base whatever its age, else the fallback rates.
+
+    This includes snapshots loaded from disk. A base that was never fetched
+    is derived from the EUR snapshot when possible.
+    """
+    snapshot = _snapshots.get(base)
+    if snapshot is not None:
+        return snapshot
+
+    eur = _snapshots.get("EUR")
+    if eur is not None and eur.rates.get(base):
+        return eur.rebased(base)
+
+    return _fallback_snapshot(base)
+
+
+async def get_rate_snapshot(base: str = "EUR") -> RateSnapshot:
+    """
+    Return the exchange rate snapshot to use for base.
+
+    A fresh snapshot is returned as it is. One past CACHE_DURATION but within
+    the configured max staleness is returned immediately while a refresh
+    starts in the background. Otherwise the caller waits for the (coalesced)
+    upstream fetch. If that fails, or the circuit is open, the last known
+    good snapshot is returned, or the fallback rates.
+    """
+    snapshot = _snapshots.get(base)
+    if snapshot is not None:
+        age = snapshot.age_seconds
+        if age < CACHE_DURATION.total_seconds():
+            return snapshot
+        if age < REFRESH_CONFIG.max_staleness:
+            _fetch_stats["stale_served"] += 1
+            try:
+                _start_fetch(base)
+            except UpstreamUnavailable:
+                pass
+            return snapshot
+
+    try:
+        return await _single_flight(base)
+    except UpstreamUnavailable:
+        return _last_known_good(base)
+    except Exception as e:
+        # If API fails, return the last known good or fallback rates (approximate)
+        print(f"Exchange rate API error: {e!r}. Using last known or fallback rates.")
+        return _last_known_good(base)
+
+
+async def fetch_exchange_rates(base: str = "EUR") -> Mapping[str, float]:
     """
-    Fetch current exchange rates from Frankfurter API.
+    Fetch current exchange rates from the configured provider.
+
+    Concurrent cache misses for the same base are coalesced onto a single
+    upstream request, and slightly stale rates are served while they are
+    revalidated in the background.
 
     Args:
         base: Base currency (default EUR)
 
     Returns:
-        Dictionary of currency codes to exchange rates
+        Read-only mapping of currency codes to exchange rates
     """
-    global _rate_cache, _cache_timestamp
+    return (await get_rate_snapshot(base)).rates
 
-    # Check cache
-    if _cache_timestamp and datetime.now() - _cache_timestamp < CACHE_DURATION:
-        if base in _rate_cache:
-            return _rate_cache[base]
 
-    url = f"https://api.frankfurter.app/latest?from={base}&to=USD,CAD,GBP,AUD"
+async def fetch_cross_rates() -> CrossRates:
+    """Cross rates for the current EUR snapshot, built once per snapshot."""
+    return (await get_rate_snapshot("EUR")).cross
 
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            data = response.json()
 
-            rates = data.get("rates", {})
-            # Add the base currency with rate 1.0
-            rates[base] = 1.0
+# Shortest wait between refresh cycles, e.g. while the upstream is failing
+_MIN_REFRESH_DELAY = 10.0
+
+
+class RateRefresher:
+    """
+    Background task that refreshes cached rates ahead of expiry.
+
+    Started and stopped from the application lifespan so request handlers
+    normally find fresh rates in the cache. Each cycle is spread by a random
+    jitter so several workers do not hit the API in lockstep.
+    """
+
+    def __init__(self, bases: tuple[str, ...] = ("EUR",), config: Optional[RefreshConfig] = None):
+        self.bases = bases
+        self.config = config or REFRESH_CONFIG
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.skipped = 0
+        self.consecutive_failures = 0
+        self.last_latency_ms: Optional[float] = None
+        self.max_latency_ms: Optional[float] = None
+        self.last_success: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def refresh(self, base: str) -> None:
+        """
+        Refresh one base currency now, recording latency or the failure.
+
+        Any error is recorded rather than raised, so one bad response can't
+        stop the background loop.
+        """
+        started = time.perf_counter()
+        try:
+            await _single_flight(base)
+        except UpstreamUnavailable:
+            self.skipped += 1
+            return
+        except Exception as e:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(e) or type(e).__name__
+            print(f"Exchange rate refresh failed for {base}: {self.last_error}")
+            return
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.refreshes += 1
+        self.consecutive_failures = 0
+        self.last_latency_ms = latency_ms
+        self.max_latency_ms = max(self.max_latency_ms or 0.0, latency_ms)
+        self.last_success = datetime.now()
+
+    async def _run(self) -> None:
+        while True:
+            # Rates loaded from a recent snapshot don't need refreshing yet
+            for base in self.bases:
+                age = _snapshot_age(base)
+                if age is None or age >= self.config.interval:
+                    await self.refresh(base)
 
-            # Update cache
-            _rate_cache[base] = rates
-            _cache_timestamp = datetime.now()
+            oldest = max((_snapshot_age(base) or 0.0) for base in self.bases)
+            jitter = random.uniform(-self.config.jitter, self.config.jitter)
+            await asyncio.sleep(max(self.config.interval - oldest + jitter, _MIN_REFRESH_DELAY))
 
-            return rates
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.config.interval,
+            "max_staleness_seconds": self.config.max_staleness,
+            "jitter_seconds": self.config.jitter,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "consecutive_failures": self.consecutive_failures,
+            "last_latency_ms": self.last_latency_ms,
+            "max_latency_ms": self.max_latency_ms,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "last_error": self.last_error,
+        }
 
-    except httpx.HTTPError as e:
-        # If API fails, return fallback rates (approximate)
-        print(f"Exchange rate API error: {e}. Using fallback rates.")
-        return get_fallback_rates(base)
+
+rate_refresher = RateRefresher()
+
+
+def get_fetch_stats() -> dict:
+    """Return upstream fetch, coalescing, circuit and background refresh counters."""
+    return {
+        **_fetch_stats,
+        "in_flight": len(_inflight),
+        "snapshots": {
+            base: {
+                "version": snapshot.version,
+                "source": snapshot.source,
+                "age_seconds": snapshot.age_seconds,
+            }
+            for base, snapshot in _snapshots.items()
+        },
+        "circuit": _breaker.stats(),
+        "providers": _provider.stats(),
+        "negative_cache": _recent_failures.stats(),
+        "refresher": rate_refresher.stats(),
+    }
 
 
 def get_fallback_rates(base: str = "EUR") -> dict[str, float]:
@@ -81,38 +531,6 @@ def get_fallback_rates(base: str = "EUR") -> dict[str, float]:
     return {curr: rate * base_to_eur for curr, rate in eur_rates.items()}
 
 
-def convert_currency(
-    amount: float,
-    from_currency: str,
-    to_currency: str,
-    rates: dict[str, float]
-) -> float:
-    """
-    Convert amount from one currency to another.
-
-    Args:
-        amount: Amount to convert
-        from_currency: Source currency code
-        to_currency: Target currency code
-        rates: Dictionary of exchange rates (with EUR as base)
-
-    Returns:
-        Converted amount
-    """
-    if from_currency == to_currency:
-        return amount
-
-    # Rates are EUR-based
-    if from_currency == "EUR":
-        return amount * rates.get(to_currency, 1.0)
-    elif to_currency == "EUR":
-        return amount / rates.get(from_currency, 1.0)
-    else:
-        # Convert via EUR
-        eur_amount = amount / rates.get(from_currency, 1.0)
-        return eur_amount * rates.get(to_currency, 1.0)
-
-
 async def get_rate_info() -> dict:
     """
     Get exchange rate information for display.
@@ -120,11 +538,18 @@ async def get_rate_info() -> dict:
     Returns:
         Dictionary with rates and metadata
     """
-    rates = await fetch_exchange_rates("EUR")
+    snapshot = await get_rate_snapshot("EUR")
+    fetched_at = snapshot.fetched_at
 
     return {
         "base": "EUR",
-        "rates": rates,
-        "date": datetime.now().strftime("%Y-%m-%d"),
-        "cached": _cache_timestamp is not None,
+        "rates": snapshot.rates,
+        # Date the rates were fetched; today for the fallback table
+        "date": (fetched_at.astimezone() if fetched_at else datetime.now()).strftime("%Y-%m-%d"),
+        "cached": fetched_at is not None,
+        "fetched_at": fetched_at,
+        "source": snapshot.source,
+        "version": snapshot.version,
+        "age_seconds": snapshot.age_seconds,
+        "stale": snapshot.stale,
     }
@@ -18,6 +18,8 @@ Note: This is seed data from publicly available sources. Users can suggest addit
 from typing import Optional
 import uuid
 
+from app.directory import Cursor, ProfessionalIndex, SearchPage
+
 # Professional categories with descriptions
 CATEGORIES = {
     "lawyer": {
@@ -3351,6 +3353,15 @@ PROFESSIONALS = [
 ]
 
 
+# Filter bitsets and display order, built once at load time
+_index = ProfessionalIndex(PROFESSIONALS, CATEGORIES)
+
+
+def get_professional_index() -> ProfessionalIndex:
+    """Return the search index over PROFESSIONALS."""
+    return _index
+
+
 def get_all_categories():
     """Return all professional categories."""
     return list(CATEGORIES.values())
@@ -3368,10 +3379,7 @@ def get_all_professionals():
 
 def get_professional_by_id(professional_id: str):
     """Get a single professional by ID."""
-    for p in PROFESSIONALS:
-        if p["id"] == professional_id:
-            return p
-    return None
+    return _index.by_id.get(professional_id)
 
 
 def search_professionals(
@@ -3379,30 +3387,54 @@ def search_professionals(
     region: Optional[str] = None,
     featured_only: bool = False,
     verified_only: bool = False,
+    language: Optional[str] = None,
+    q: Optional[str] = None,
 ) -> list[dict]:
-    """Search professionals with filters."""
-    results = PROFESSIONALS.copy()
+    """
+    Search professionals with filters and an optional free-text query.
 
-    if category:
-        results = [p for p in results if p["category"] == category]
+    Sorted featured first, then verified, then alphabetically, or by
+    relevance when q is given. The returned dicts are the directory entries
+    themselves; don't modify them.
+    """
+    return search_professionals_page(
+        category, region, featured_only, verified_only, language, q
+    ).entries
 
-    if region:
-        results = [p for p in results if region in p["regions"] or "all" in p["regions"]]
 
-    if featured_only:
-        results = [p for p in results if p.get("featured", False)]
-
-    if verified_only:
-        results = [p for p in results if p.get("verified", False)]
-
-    # Sort: featured first, then verified, then alphabetically
-    results.sort(key=lambda p: (
-        not p.get("featured", False),
-        not p.get("verified", False),
-        p["name"].lower()
-    ))
+def search_professionals_page(
+    category: Optional[str] = None,
+    region: Optional[str] = None,
+    featured_only: bool = False,
+    verified_only: bool = False,
+    language: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[Cursor] = None,
+    facets: bool = False,
+) -> SearchPage:
+    """
+    One page of search_professionals() results, after a previous page's cursor.
 
-    return results
+    With facets, the page also counts matches per category, region,
+    language, featured and verified value. Category and region ids are
+    matched ignoring case. Raises ValueError for a cursor from a different
+    search or for an entry that has been removed.
+    """
+    # Ids are lowercase; normalize here so the cursor key sees the same values
+    category = category.lower() if category else category
+    region = region.lower() if region else region
+    return _index.page(
+        q=q,
+        limit=limit,
+        after=after,
+        facets=facets,
+        category=category,
+        region=region,
+        language=language,
+        featured_only=featured_only,
+        verified_only=verified_only,
+    )
 
 
 def get_professionals_by_category():
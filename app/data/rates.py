@@ -14,6 +14,7 @@ CADASTRAL_MULTIPLIERS = {
 # Registration Tax (Imposta di Registro) rates
 REGISTRATION_TAX = {
     "prima_casa_private": 0.02,    # 2% of cadastral value
+    "prima_casa_minimum": 1000,    # Minimum €1,000 at the prima casa rate
     "second_home_private": 0.09,   # 9% of cadastral value
     "from_developer": 200,         # Fixed €200 when buying from developer
 }
@@ -84,6 +85,12 @@ MORTGAGE_FEES = {
     "valuation_fee_default": 300,
 }
 
+# Default mortgage terms when the buyer does not specify them
+MORTGAGE_DEFAULTS = {
+    "annual_rate": 0.035,   # 3.5% typical fixed rate
+    "term_years": 25,
+}
+
 # Currency conversion cost estimate
 CURRENCY_CONVERSION_SPREAD = {
     "bank_transfer": 0.02,    # ~2% typical bank spread
@@ -115,7 +122,16 @@ UTILITY_ESTIMATES = {
     "total_per_sqm": 16,
 }
 
-# Supported currencies
+# Annual escalation estimates for ongoing costs (multi-year projections)
+COST_ESCALATION = {
+    "imu": 0.01,            # Municipal rate changes; cadastral values rarely revalued
+    "tari": 0.03,           # Waste tax tracks service costs
+    "condominium": 0.025,   # Roughly general inflation
+    "utilities": 0.03,      # Energy prices
+}
+
+# Currencies offered by default in the UI and multi-currency results; any
+# currency the rate provider offers is accepted
 SUPPORTED_CURRENCIES = ["EUR", "USD", "CAD", "GBP", "AUD"]
 
 # Property types
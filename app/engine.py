@@ -0,0 +1,325 @@
+"""
+Vectorized cost engine for pricing many properties in one pass.
+
+Applies the same rules as app/calculator.py, but evaluates them as NumPy
+column operations over a whole batch of PropertyInput instead of building
+CostItem objects one property at a time.
+"""
+
+from dataclasses import dataclass, fields, replace
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.models import PropertyInput
+from app.data.rates import (
+    CADASTRAL_MULTIPLIERS,
+    REGISTRATION_TAX,
+    VAT_RATES,
+    LUXURY_CATEGORIES,
+    MORTGAGE_TAX,
+    CADASTRAL_TAX,
+    AGENCY_COMMISSION,
+    PROFESSIONAL_FEES,
+    MORTGAGE_FEES,
+    CURRENCY_CONVERSION_SPREAD,
+    IMU_RATES,
+    TARI_RATES,
+    UTILITY_ESTIMATES,
+)
+from app.schedules import NOTARY_FEES
+from app.fx import CrossRates
+
+
+# Line item columns, in the same order calculate_total emits them
+ONE_TIME_ITEMS = (
+    "Registration Tax (Imposta di Registro)",
+    "VAT (IVA)",
+    "Mortgage Tax (Imposta Ipotecaria)",
+    "Cadastral Tax (Imposta Catastale)",
+    "Notary Fees",
+    "Agency Commission",
+    "Geometra (Surveyor)",
+    "Technical Reports",
+    "Translator",
+    "Bank Fees",
+    "Mortgage Registration Tax",
+    "Property Valuation",
+    "Currency Transfer Cost",
+    "Renovation Budget",
+)
+
+ANNUAL_ITEMS = (
+    "IMU (Property Tax)",
+    "TARI (Waste Tax)",
+    "Condominium Fees",
+    "Utilities (Estimate)",
+)
+
+# Short keys for ANNUAL_ITEMS, matching COST_ESCALATION
+ANNUAL_ITEM_KEYS = ("imu", "tari", "condominium", "utilities")
+
+
+@dataclass(frozen=True)
+class PropertyColumns:
+    """Column-oriented view of a batch of PropertyInput."""
+    purchase_price: np.ndarray
+    cadastral_income: np.ndarray
+    prima_casa: np.ndarray
+    developer: np.ndarray
+    luxury: np.ndarray
+    currency: np.ndarray
+    foreign: np.ndarray
+    include_agency_fee: np.ndarray
+    agency_rate: np.ndarray
+    include_geometra: np.ndarray
+    include_translator: np.ndarray
+    using_mortgage: np.ndarray
+    mortgage_amount: np.ndarray
+    renovation_budget: np.ndarray
+    property_size_sqm: np.ndarray
+    is_apartment: np.ndarray
+    monthly_condo_fee: np.ndarray
+
+    @classmethod
+    def from_inputs(cls, props: Sequence[PropertyInput]) -> "PropertyColumns":
+        """Build columns from a sequence of PropertyInput, preserving order."""
+        def floats(values) -> np.ndarray:
+            # Missing optional values become 0, matching the calculator's truthiness checks
+            return np.array([v or 0.0 for v in values], dtype=float)
+
+        def flags(values) -> np.ndarray:
+            return np.array(list(values), dtype=bool)
+
+        return cls(
+            purchase_price=floats(p.purchase_price for p in props),
+            cadastral_income=floats(p.cadastral_income for p in props),
+            prima_casa=flags(p.prima_casa for p in props),
+            developer=flags(p.seller_type.value == "developer" for p in props),
+            luxury=flags(
+                bool(p.cadastral_category) and p.cadastral_category.upper() in LUXURY_CATEGORIES
+                for p in props
+            ),
+            currency=np.array([p.source_currency for p in props], dtype=str),
+            foreign=flags(p.source_currency != "EUR" for p in props),
+            include_agency_fee=flags(p.include_agency_fee for p in props),
+            agency_rate=floats(p.agency_rate for p in props),
+            include_geometra=flags(p.include_geometra for p in props),
+            include_translator=flags(p.include_translator for p in props),
+            using_mortgage=flags(p.using_mortgage for p in props),
+            mortgage_amount=floats(p.mortgage_amount for p in props),
+            renovation_budget=floats(p.renovation_budget for p in props),
+            property_size_sqm=floats(p.property_size_sqm for p in props),
+            is_apartment=flags(p.is_apartment for p in props),
+            monthly_condo_fee=floats(p.monthly_condo_fee for p in props),
+        )
+
+    def __len__(self) -> int:
+        return len(self.purchase_price)
+
+    def broadcast(self, n: int) -> "PropertyColumns":
+        """Repeat a single-row batch n times without copying."""
+        return PropertyColumns(**{
+            f.name: np.broadcast_to(getattr(self, f.name), (n,)) for f in fields(self)
+        })
+
+
+@dataclass(frozen=True)
+class BatchCosts:
+    """
+    Costs for a batch of properties, all in EUR.
+
+    one_time and annual are (n_properties, n_items) matrices whose columns
+    follow ONE_TIME_ITEMS and ANNUAL_ITEMS.
+    """
+    purchase_price: np.ndarray
+    cadastral_value: np.ndarray
+    one_time: np.ndarray
+    annual: np.ndarray
+
+    @property
+    def total_one_time(self) -> np.ndarray:
+        return self.one_time.sum(axis=1)
+
+    @property
+    def total_annual(self) -> np.ndarray:
+        return self.annual.sum(axis=1)
+
+    @property
+    def grand_total_first_year(self) -> np.ndarray:
+        return self.purchase_price + self.total_one_time + self.total_annual
+
+    @property
+    def one_time_percentage(self) -> np.ndarray:
+        return self.total_one_time / self.purchase_price * 100
+
+    def __len__(self) -> int:
+        return len(self.purchase_price)
+
+
+def cadastral_values(cols: PropertyColumns) -> np.ndarray:
+    """Cadastral value per property, estimated at 40% of price when income is missing."""
+    multiplier = np.where(
+        cols.prima_casa, CADASTRAL_MULTIPLIERS["prima_casa"], CADASTRAL_MULTIPLIERS["other"]
+    )
+    return np.where(
+        cols.cadastral_income > 0,
+        cols.cadastral_income * multiplier,
+        cols.purchase_price * 0.40,
+    )
+
+
+def mortgage_principal(cols: PropertyColumns) -> np.ndarray:
+    """Loan amount per property: 70% of price if unspecified, 0 without a mortgage."""
+    amount = np.where(cols.mortgage_amount > 0, cols.mortgage_amount, cols.purchase_price * 0.7)
+    return np.where(cols.using_mortgage, amount, 0.0)
+
+
+def one_time_costs(cols: PropertyColumns, cadastral_value: np.ndarray) -> np.ndarray:
+    """One-time purchase costs as an (n, len(ONE_TIME_ITEMS)) matrix."""
+    price = cols.purchase_price
+    prima = cols.prima_casa
+    dev = cols.developer
+    out = np.zeros((len(cols), len(ONE_TIME_ITEMS)))
+
+    # Registration tax: fixed from developer, on cadastral value otherwise
+    private_reg = np.where(
+        prima,
+        np.maximum(
+            cadastral_value * REGISTRATION_TAX["prima_casa_private"],
+            REGISTRATION_TAX["prima_casa_minimum"],
+        ),
+        cadastral_value * REGISTRATION_TAX["second_home_private"],
+    )
+    out[:, 0] = np.where(dev, REGISTRATION_TAX["from_developer"], private_reg)
+
+    # VAT only applies to developer sales
+    vat_rate = np.where(
+        cols.luxury,
+        VAT_RATES["luxury"],
+        np.where(prima, VAT_RATES["prima_casa"], VAT_RATES["second_home"]),
+    )
+    out[:, 1] = np.where(dev, price * vat_rate, 0.0)
+
+    out[:, 2] = np.where(
+        dev,
+        MORTGAGE_TAX["from_developer"],
+        np.where(prima, MORTGAGE_TAX["prima_casa_private"], cadastral_value * MORTGAGE_TAX["second_home_private"]),
+    )
+    out[:, 3] = np.where(
+        dev,
+        CADASTRAL_TAX["from_developer"],
+        np.where(prima, CADASTRAL_TAX["prima_casa_private"], cadastral_value * CADASTRAL_TAX["second_home_private"]),
+    )
+
+    out[:, 4] = NOTARY_FEES.evaluate(price)
+
+    agency_rate = np.where(cols.agency_rate > 0, cols.agency_rate, AGENCY_COMMISSION["rate"])
+    out[:, 5] = np.where(
+        cols.include_agency_fee,
+        price * agency_rate * (1 + AGENCY_COMMISSION["vat_rate"]),
+        0.0,
+    )
+
+    out[:, 6] = np.where(cols.include_geometra, PROFESSIONAL_FEES["geometra_default"], 0.0)
+    out[:, 7] = PROFESSIONAL_FEES["technical_reports_default"]
+    out[:, 8] = np.where(cols.include_translator, PROFESSIONAL_FEES["translator_default"], 0.0)
+
+    # Mortgage-related costs
+    mortgage = mortgage_principal(cols)
+    mortgage_reg_rate = np.where(
+        prima,
+        MORTGAGE_FEES["registration_tax_prima_casa"],
+        MORTGAGE_FEES["registration_tax_second_home"],
+    )
+    out[:, 9] = np.where(cols.using_mortgage, MORTGAGE_FEES["bank_fee_default"], 0.0)
+    out[:, 10] = mortgage * mortgage_reg_rate
+    out[:, 11] = np.where(cols.using_mortgage, MORTGAGE_FEES["valuation_fee_default"], 0.0)
+
+    out[:, 12] = np.where(cols.foreign, price * CURRENCY_CONVERSION_SPREAD["default"], 0.0)
+    out[:, 13] = cols.renovation_budget
+
+    return out
+
+
+def annual_costs(cols: PropertyColumns, cadastral_value: np.ndarray) -> np.ndarray:
+    """Ongoing annual costs as an (n, len(ANNUAL_ITEMS)) matrix."""
+    size = np.where(cols.property_size_sqm > 0, cols.property_size_sqm, 100.0)
+    out = np.zeros((len(cols), len(ANNUAL_ITEMS)))
+
+    imu_rate = np.where(
+        cols.prima_casa,
+        np.where(cols.luxury, IMU_RATES["prima_casa_luxury"], 0.0),
+        IMU_RATES["second_home_default"],
+    )
+    out[:, 0] = cadastral_value * imu_rate
+    out[:, 1] = size * TARI_RATES["default_per_sqm"]
+
+    estimated_condo = (100 + size * 0.5) * 12
+    condo = np.where(cols.monthly_condo_fee > 0, cols.monthly_condo_fee * 12, estimated_condo)
+    out[:, 2] = np.where(cols.is_apartment, condo, 0.0)
+
+    out[:, 3] = size * UTILITY_ESTIMATES["total_per_sqm"]
+
+    return out
+
+
+def calculate_columns(cols: PropertyColumns) -> BatchCosts:
+    """Run the full rule set over already-columnized inputs."""
+    cadastral_value = cadastral_values(cols)
+    return BatchCosts(
+        purchase_price=cols.purchase_price,
+        cadastral_value=cadastral_value,
+        one_time=one_time_costs(cols, cadastral_value),
+        annual=annual_costs(cols, cadastral_value),
+    )
+
+
+def calculate_batch(props: Sequence[PropertyInput]) -> BatchCosts:
+    """
+    Calculate costs for many properties at once.
+
+    Results are in EUR and in input order. Use exchange_rates_for() or
+    CrossRates.convert() on the same columns to convert them with a single
+    rate snapshot.
+    """
+    return calculate_columns(PropertyColumns.from_inputs(props))
+
+
+def calculate_grid(
+    base: PropertyInput,
+    purchase_price: np.ndarray,
+    cadastral_income: np.ndarray,
+    mortgage_amount: Optional[np.ndarray] = None,
+) -> BatchCosts:
+    """
+    Calculate costs over the Cartesian product of three input axes.
+
+    Every other field comes from base. Rows are in row-major order of
+    (purchase_price, cadastral_income, mortgage_amount), so results can be
+    reshaped to (len(purchase_price), len(cadastral_income), len(mortgage_amount)).
+    A cadastral income of 0 means "estimate from purchase price", as in the
+    calculator. Swept mortgage amounts are loan sizes: 0 means no mortgage,
+    whatever base says. Without a mortgage axis base's mortgage is used.
+    """
+    if mortgage_amount is None:
+        mortgage_amount = np.array([base.mortgage_amount or 0.0])
+        using = np.array([base.using_mortgage])
+    else:
+        using = mortgage_amount > 0
+    price, income, mortgage = np.meshgrid(
+        purchase_price, cadastral_income, mortgage_amount, indexing="ij"
+    )
+    cols = replace(
+        PropertyColumns.from_inputs([base]).broadcast(price.size),
+        purchase_price=price.ravel(),
+        cadastral_income=income.ravel(),
+        mortgage_amount=mortgage.ravel(),
+        using_mortgage=np.broadcast_to(using, price.shape).ravel(),
+    )
+    return calculate_columns(cols)
+
+
+def exchange_rates_for(cols: PropertyColumns, cross: CrossRates) -> np.ndarray:
+    """Per-row EUR -> source currency rate from one snapshot (NaN for EUR rows)."""
+    return np.where(cols.foreign, cross.rate("EUR", cols.currency), np.nan)
@@ -0,0 +1,173 @@
+"""
+In-memory full-text search with BM25 ranking.
+
+Text is accent-folded ("Città" -> "citta"), lowercased and split into
+words; stop words are dropped and the rest lightly stemmed so Italian and
+English inflections meet ("notai"/"notaio", "services"/"service"). The
+index stores, per term, the matching document ids with their precomputed
+BM25 weight, so a query is a few array additions and a sort of the hits.
+"""
+
+import math
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+    a an and are as at be by do does for from has have i in is it me my not of
+    on or our that the their this to we who with you your
+    al alla con da dal dei del della delle di e ed gli il in la le lo nel
+    nella per su sul tra un una uno
+""".split())
+
+
+def fold(text: str) -> str:
+    """Lowercase text and strip accents, dropping other non-ASCII characters."""
+    text = text.casefold()
+    if text.isascii():
+        return text
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """
+    Light suffix stripping for Italian and English.
+
+    Removes English plural and -ing endings, then trailing vowels, which
+    carry gender and number in Italian. Short words and numbers are kept.
+    """
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif word.endswith("ing") and len(word) > 5:
+        word = word[:-3]
+    elif word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    stripped = word.rstrip("aeiou")
+    return stripped if len(stripped) >= 3 else word
+
+
+def tokenize(text: str) -> list[str]:
+    """Search terms in text, in order."""
+    return [stem(word) for word in _WORD.findall(fold(text)) if word not in STOP_WORDS]
+
+
+# A field value: a string or a list of strings
+FieldValue = Union[str, Sequence[str], None]
+
+
+def _field_text(value: FieldValue) -> str:
+    if not value:
+        return ""
+    return value if isinstance(value, str) else " ".join(value)
+
+
+class FullTextIndex:
+    """
+    BM25 index over documents made of weighted text fields.
+
+    Field weights scale term frequencies and lengths (a simple BM25F), so a
+    match in a heavily weighted field such as the name counts for more.
+    Document ids are positions in the sequence the index was built from.
+    """
+
+    def __init__(
+        self,
+        documents: Sequence[Mapping[str, FieldValue]],
+        weights: Mapping[str, float],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.size = len(documents)
+        postings: dict[str, tuple[list[int], list[float]]] = {}
+        lengths = np.zeros(self.size)
+        for doc_id, document in enumerate(documents):
+            frequencies: dict[str, float] = {}
+            length = 0.0
+            for field, weight in weights.items():
+                terms = tokenize(_field_text(document.get(field)))
+                length += weight * len(terms)
+                for term in terms:
+                    frequencies[term] = frequencies.get(term, 0.0) + weight
+            lengths[doc_id] = length
+            for term, frequency in frequencies.items():
+                docs, tfs = postings.setdefault(term, ([], []))
+                docs.append(doc_id)
+                tfs.append(frequency)
+
+        avg_length = lengths.mean() if self.size and lengths.any() else 1.0
+        length_norm = k1 * (1 - b + b * lengths / avg_length)
+        self.postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for term, (docs, tfs) in postings.items():
+            docs = np.array(docs, dtype=np.int32)
+            tf = np.array(tfs)
+            idf = math.log(1 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            self.postings[term] = (docs, idf * tf * (k1 + 1) / (tf + length_norm[docs]))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for query; zero where no term matches."""
+        scores = np.zeros(self.size)
+        # Add in a fixed order so scores are identical in every process
+        for term in sorted(set(tokenize(query))):
+            posting = self.postings.get(term)
+            if posting is not None:
+                docs, weights = posting
+                # A term lists each document once, so plain fancy-index add is safe
+                scores[docs] += weights
+        return scores
+
+    def search(
+        self,
+        query: str,
+        candidates: Optional[np.ndarray] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[float, int]] = None,
+    ) -> tuple[np.ndarray, np.ndarray, int]:
+        """
+        Document ids matching any query term, best first, with their scores.
+
+        candidates is an optional boolean mask over document ids; only those
+        documents are returned. Equal scores keep document id order. after is
+        the (score, id) of the last document of a previous page; only
+        documents ranked below it are returned. The last value is the number
+        of matches ignoring after and limit.
+        """
+        return rank(self.scores(query), candidates, limit, after)
+
+
+def rank(
+    scores: np.ndarray,
+    candidates: Optional[np.ndarray] = None,
+    limit: Optional[int] = None,
+    after: Optional[tuple[float, int]] = None,
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """Order the documents with a positive score, as in FullTextIndex.search()."""
+    hits = np.flatnonzero(scores)
+    if candidates is not None:
+        hits = hits[candidates[hits]]
+    total = len(hits)
+    if after is not None:
+        score, doc = after
+        hit_scores = scores[hits]
+        hits = hits[(hit_scores < score) | ((hit_scores == score) & (hits > doc))]
+    if limit is not None and limit < len(hits):
+        # Only sort the hits scoring at least the limit-th best
+        hit_scores = scores[hits]
+        threshold = np.partition(hit_scores, len(hits) - limit)[len(hits) - limit]
+        hits = hits[hit_scores >= threshold]
+    order = np.lexsort((hits, -scores[hits]))
+    if limit is not None:
+        order = order[:limit]
+    hits = hits[order]
+    return hits, scores[hits], total
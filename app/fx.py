@@ -0,0 +1,94 @@
+"""
+Cross-rate matrix for vectorized currency conversion.
+
+A CrossRates holds every pairwise rate between the currencies of one
+exchange-rate snapshot, so converting whole arrays of amounts is a single
+indexed multiply instead of a dict lookup (and a detour through EUR) per
+amount. With a few dozen currencies the matrix is a few kilobytes.
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+
+# A currency code, a matrix index, or arrays/sequences of either
+Currencies = Union[str, int, Sequence[str], np.ndarray]
+
+
+@dataclass(frozen=True)
+class CrossRates:
+    """
+    Immutable N x N cross rates for one snapshot.
+
+    matrix[i, j] is the number of units of currencies[j] per unit of
+    currencies[i]. The matrix is read-only and safe to share.
+    """
+    currencies: tuple[str, ...]
+    index: Mapping[str, int]
+    matrix: np.ndarray
+
+    @classmethod
+    def from_rates(
+        cls,
+        rates: dict[str, float],
+        base: str = "EUR",
+        currencies: Optional[Sequence[str]] = None
+    ) -> "CrossRates":
+        """
+        Build the matrix from base -> currency rates.
+
+        currencies defaults to base followed by every currency in rates, in
+        code order. Missing rates default to 1.0.
+        """
+        if currencies is None:
+            currencies = [base] + sorted(code for code in rates if code != base)
+        per_base = np.array([
+            1.0 if code == base else rates.get(code, 1.0) for code in currencies
+        ], dtype=float)
+        matrix = per_base[None, :] / per_base[:, None]
+        matrix.setflags(write=False)
+        return cls(
+            currencies=tuple(currencies),
+            index=MappingProxyType({code: i for i, code in enumerate(currencies)}),
+            matrix=matrix,
+        )
+
+    def indices(self, codes: Currencies) -> Union[int, np.ndarray]:
+        """Matrix index for a code, or an index array for many codes."""
+        if isinstance(codes, str):
+            return self.index[codes]
+        if isinstance(codes, (int, np.integer)):
+            return codes
+        codes = np.asarray(codes)
+        if codes.dtype.kind in "iu":
+            return codes
+        return np.array([self.index[c] for c in codes.ravel()], dtype=np.intp).reshape(codes.shape)
+
+    def rate(self, from_currency: Currencies, to_currency: Currencies) -> Union[float, np.ndarray]:
+        """Units of to_currency per unit of from_currency (broadcasting)."""
+        return self.matrix[self.indices(from_currency), self.indices(to_currency)]
+
+    def convert(
+        self,
+        amounts: np.ndarray,
+        from_currency: Currencies,
+        to_currency: Currencies
+    ) -> np.ndarray:
+        """
+        Convert amounts in one vectorized operation.
+
+        Each currency argument is a single code or an array of codes/indices
+        broadcast against amounts, so one call can convert every row of a
+        batch into its own currency.
+        """
+        return np.asarray(amounts, dtype=float) * self.rate(from_currency, to_currency)
+
+    def __contains__(self, currency: str) -> bool:
+        return currency in self.index
+
+    def row(self, base: str = "EUR") -> dict[str, float]:
+        """base -> currency rates as a plain dict."""
+        return dict(zip(self.currencies, self.matrix[self.index[base]].tolist()))
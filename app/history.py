@@ -0,0 +1,248 @@
+"""
+Historical daily exchange rates.
+
+Daily EUR -> currency rates are stored as two arrays: the sorted trading
+dates (datetime64[D]) and a (days, currencies) rate matrix. Range and as-of
+lookups are binary searches over the dates that return views, and a saved
+store is memory-mapped so a query only reads the pages it touches.
+
+Load data from Frankfurter-style range responses, either saved JSON files
+or fetched from the API (or a local stand-in via FRANKFURTER_URL):
+
+    python -m app.history load rates-2024.json rates-2025.json
+    python -m app.history fetch 2020-01-01 2026-01-01
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from app.clients import clients
+from app.providers import FRANKFURTER_URL
+
+
+HISTORY_PATH = Path(os.environ.get(
+    "RATE_HISTORY_PATH",
+    Path(__file__).resolve().parent.parent / "var" / "rate_history",
+))
+
+# Longest span requested from the API at once
+_FETCH_CHUNK_DAYS = 365
+
+# Names the current data directory of a saved store
+_MANIFEST = "manifest.json"
+
+
+@dataclass(frozen=True)
+class RateHistory:
+    """
+    Daily EUR -> currency rates.
+
+    dates is ascending with one entry per trading day; rates[i, j] is the
+    rate for currencies[j] on dates[i] (NaN if unknown).
+    """
+    currencies: tuple[str, ...]
+    dates: np.ndarray
+    rates: np.ndarray
+
+    @classmethod
+    def empty(cls, currencies: Sequence[str] = ()) -> "RateHistory":
+        return cls(
+            currencies=tuple(currencies),
+            dates=np.array([], dtype="datetime64[D]"),
+            rates=np.empty((0, len(currencies))),
+        )
+
+    @classmethod
+    def from_frankfurter(
+        cls,
+        payloads: Iterable[dict],
+        currencies: Optional[Sequence[str]] = None
+    ) -> "RateHistory":
+        """
+        Build a store from Frankfurter range responses.
+
+        Each payload looks like {"base": "EUR", "rates": {"2024-01-02":
+        {"USD": 1.09, ...}, ...}}. Later payloads win on duplicate dates.
+        currencies defaults to every currency that appears.
+        """
+        by_date: dict[str, dict[str, float]] = {}
+        for payload in payloads:
+            if payload.get("base", "EUR") != "EUR":
+                raise ValueError(f"Expected EUR-based rates, got {payload['base']}")
+            by_date.update(payload.get("rates", {}))
+
+        days = sorted(by_date)
+        if currencies is None:
+            currencies = sorted({code for day_rates in by_date.values() for code in day_rates})
+        return cls(
+            currencies=tuple(currencies),
+            dates=np.array(days, dtype="datetime64[D]"),
+            rates=np.array(
+                [[by_date[d].get(c, np.nan) for c in currencies] for d in days], dtype=float
+            ).reshape(len(days), len(currencies)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def with_currencies(self, currencies: Sequence[str]) -> "RateHistory":
+        """The same days over currencies, NaN for currencies this store lacks."""
+        rates = np.full((len(self), len(currencies)), np.nan)
+        for j, code in enumerate(currencies):
+            if code in self.currencies:
+                rates[:, j] = self.column(code)
+        return RateHistory(tuple(currencies), self.dates, rates)
+
+    def merge(self, other: "RateHistory") -> "RateHistory":
+        """
+        Combine two stores over all their currencies and dates.
+
+        On shared dates other wins wherever it has a rate, so merging in a
+        file with fewer currencies keeps the others.
+        """
+        currencies = tuple(sorted(set(self.currencies) | set(other.currencies)))
+        mine, theirs = self.with_currencies(currencies), other.with_currencies(currencies)
+        dates = np.union1d(mine.dates, theirs.dates)
+        rates = np.full((len(dates), len(currencies)), np.nan)
+        rates[np.searchsorted(dates, mine.dates)] = mine.rates
+        rows = np.searchsorted(dates, theirs.dates)
+        rates[rows] = np.where(np.isnan(theirs.rates), rates[rows], theirs.rates)
+        return RateHistory(currencies, dates, rates)
+
+    def between(self, start: date, end: date) -> "RateHistory":
+        """Days from start to end inclusive, as views into this store."""
+        lo = np.searchsorted(self.dates, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self.dates, np.datetime64(end, "D"), side="right")
+        return RateHistory(self.currencies, self.dates[lo:hi], self.rates[lo:hi])
+
+    def as_of(self, day: date) -> Optional[tuple[date, dict[str, float]]]:
+        """Rates from the last trading day on or before day, with that date."""
+        i = np.searchsorted(self.dates, np.datetime64(day, "D"), side="right") - 1
+        if i < 0:
+            return None
+        return self.dates[i].item(), {"EUR": 1.0, **dict(zip(self.currencies, self.rates[i].tolist()))}
+
+    def column(self, currency: str) -> np.ndarray:
+        """Daily EUR -> currency rates, aligned with dates."""
+        return self.rates[:, self.currencies.index(currency)]
+
+    def save(self, path: Path = HISTORY_PATH) -> None:
+        """
+        Write the store to path, replacing a saved one atomically.
+
+        The arrays go into a new version directory, then the manifest naming
+        it and the currencies is renamed into place, so load() sees the old
+        store or the new one, never a mix. The previous version is kept for
+        readers still opening it; older ones are removed.
+        """
+        path.mkdir(parents=True, exist_ok=True)
+        version = f"v{time.time_ns()}-{os.getpid()}"
+        (path / version).mkdir()
+        np.save(path / version / "dates.npy", self.dates)
+        np.save(path / version / "rates.npy", self.rates)
+
+        tmp = path / f".{_MANIFEST}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps({"version": version, "currencies": list(self.currencies)}))
+        os.replace(tmp, path / _MANIFEST)
+
+        versions = sorted(p for p in path.glob("v*-*") if p.is_dir())
+        for old in versions[:-2]:
+            shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: Path = HISTORY_PATH, mmap: bool = True) -> "RateHistory":
+        """Open a saved store, memory-mapped by default."""
+        manifest = json.loads((path / _MANIFEST).read_text())
+        data = path / manifest["version"]
+        mode = "r" if mmap else None
+        return cls(
+            currencies=tuple(manifest["currencies"]),
+            dates=np.load(data / "dates.npy", mmap_mode=mode),
+            rates=np.load(data / "rates.npy", mmap_mode=mode),
+        )
+
+    @staticmethod
+    def saved_at(path: Path = HISTORY_PATH) -> Optional[tuple[int, int]]:
+        """Identifies the saved version at path (changes on every save), or None."""
+        try:
+            stat = (path / _MANIFEST).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+
+_history: Optional[RateHistory] = None
+_history_saved_at: Optional[tuple[int, int]] = None
+
+
+def get_history() -> RateHistory:
+    """
+    The saved store (empty if none has been saved).
+
+    Reopened when the manifest changes, so `python -m app.history load`
+    takes effect without restarting the server.
+    """
+    global _history, _history_saved_at
+    saved_at = RateHistory.saved_at(HISTORY_PATH)
+    if _history is None or saved_at != _history_saved_at:
+        _history = RateHistory.load(HISTORY_PATH) if saved_at is not None else RateHistory.empty()
+        _history_saved_at = saved_at
+    return _history
+
+
+async def fetch_history(start: date, end: date) -> RateHistory:
+    """Fetch daily rates from Frankfurter, one year per request."""
+    payloads = []
+    chunk_start = np.datetime64(start, "D")
+    last = np.datetime64(end, "D")
+    while chunk_start <= last:
+        chunk_end = min(chunk_start + _FETCH_CHUNK_DAYS - 1, last)
+        url = f"{FRANKFURTER_URL}/{chunk_start}..{chunk_end}?from=EUR"
+        response = await clients.get("frankfurter").get(url)
+        response.raise_for_status()
+        payloads.append(response.json())
+        chunk_start = chunk_end + 1
+    return RateHistory.from_frankfurter(payloads)
+
+
+async def _fetch_once(start: date, end: date) -> RateHistory:
+    try:
+        return await fetch_history(start, end)
+    finally:
+        await clients.aclose()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load historical exchange rates")
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("load", help="Load Frankfurter range JSON files")
+    load.add_argument("files", nargs="+", type=Path)
+    fetch = commands.add_parser("fetch", help="Fetch a date range from Frankfurter")
+    fetch.add_argument("start", type=date.fromisoformat)
+    fetch.add_argument("end", type=date.fromisoformat)
+    args = parser.parse_args(argv)
+
+    if args.command == "load":
+        new = RateHistory.from_frankfurter(json.loads(f.read_text()) for f in args.files)
+    else:
+        new = asyncio.run(_fetch_once(args.start, args.end))
+
+    merged = RateHistory.load(mmap=False).merge(new) if RateHistory.saved_at() is not None else new
+    if not len(merged):
+        parser.error("No rates found")
+    merged.save()
+    print(f"Saved {len(merged)} days ({merged.dates[0]} to {merged.dates[-1]}) to {HISTORY_PATH}")
+
+
+if __name__ == "__main__":
+    main()
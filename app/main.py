@@ -2,23 +2,53 @@
 FastAPI application for Italy Property Cost Calculator and Listing Translator.
 """
 
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, Response, HTTPException, Query
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from pathlib import Path
+from typing import Literal, Optional
+from contextlib import asynccontextmanager
 from dataclasses import asdict
 
+import numpy as np
+
 from app.models import (
     PropertyInput, CalculationResult, ExchangeRates, TaxRatesResponse,
+    MultiCurrencyResult, BatchCalculationRow, BatchCalculationResult,
+    GridAxis, SensitivityGridRequest, SensitivityGridResult,
+    ProjectionRequest, PropertyProjection, ProjectionResult,
+    MortgageInput, MortgageType, MortgageSummary,
+    UncertaintyRequest, PercentileRange, PropertyUncertainty, UncertaintyResult,
+    BudgetSolveRequest, BudgetSolution, BudgetSolveResult,
+    HistoricalRepriceRequest, HistoricalReprice,
     TranslateRequest, TranslateResponse, TranslateErrorResponse,
     PropertyListing, OriginalText, SupportedSitesResponse, SupportedSite,
     Region, RegionSummary, MarketSummary, RegionCompareResponse,
-    Professional, ProfessionalCategory, ProfessionalSearchResponse,
+    Professional, ProfessionalCategory, ProfessionalFields, ProfessionalFacets, ProfessionalSearchResponse,
+    AutocompleteSuggestion, AutocompleteResponse,
+)
+from app.calculator import (
+    calculate_total_cached, calculate_all_currencies, get_result_cache_stats,
+)
+from app.engine import (
+    PropertyColumns, calculate_columns, calculate_grid,
+    exchange_rates_for, mortgage_principal, ONE_TIME_ITEMS, ANNUAL_ITEMS,
+)
+from app.projection import ProjectionAssumptions, project_ownership
+from app.mortgage import MortgageTerms, mortgage_summary, stream_csv, stream_ndjson
+from app.uncertainty import simulate_batch
+from app.solver import solve_max_price, all_in_cost
+from app.history import get_history
+from app.directory import Cursor
+from app.autocomplete import get_autocomplete, MAX_SUGGESTIONS
+from app.currency import (
+    fetch_exchange_rates, fetch_cross_rates, get_rate_info, get_fetch_stats,
+    rate_refresher, load_rate_snapshot,
 )
-from app.calculator import calculate_total
-from app.currency import fetch_exchange_rates, get_rate_info
+from app.clients import clients
 from app.data.rates import (
+    SUPPORTED_CURRENCIES,
     REGISTRATION_TAX,
     VAT_RATES,
     MORTGAGE_TAX,
@@ -37,15 +67,40 @@ from app.data.regions import (
 )
 from app.data.professionals import (
     get_all_categories, get_category, get_all_professionals,
-    get_professional_by_id, search_professionals, get_regions_with_professionals,
+    get_professional_by_id, search_professionals_page, get_regions_with_professionals,
 )
 
 
+# Maximum number of properties accepted by the batch endpoint
+MAX_BATCH_SIZE = 1000
+
+# Maximum number of cells in a sensitivity grid
+MAX_GRID_CELLS = 100_000
+
+# Maximum number of loans per mortgage request
+MAX_MORTGAGE_BATCH = 10_000
+
+# Maximum properties x draws per uncertainty request (about half a second of sampling)
+MAX_UNCERTAINTY_SAMPLES = 1_000_000
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared HTTP clients and keep exchange rates warm while the app runs."""
+    clients.open()
+    load_rate_snapshot()
+    rate_refresher.start()
+    yield
+    await rate_refresher.stop()
+    await clients.aclose()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Italy Property Tools",
     description="Cost calculator and listing translator for Italian property purchases",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Setup paths
@@ -66,6 +121,13 @@ async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 
+def _require_currencies(available, currencies) -> None:
+    """Reject currencies missing from the current exchange-rate table."""
+    missing = sorted(set(currencies) - set(available))
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unsupported currency: {', '.join(missing)}")
+
+
 @app.post("/api/calculate", response_model=CalculationResult)
 async def calculate(prop: PropertyInput):
     """
@@ -75,25 +137,369 @@ async def calculate(prop: PropertyInput):
     """
     # Fetch exchange rates
     rates = await fetch_exchange_rates("EUR")
+    _require_currencies(rates, [prop.source_currency])
 
-    # Perform calculation
-    result = calculate_total(prop, rates)
+    # Perform calculation (EUR result is memoized, then projected)
+    result = calculate_total_cached(prop, rates)
 
     return result
 
 
+@app.post("/api/calculate/currencies", response_model=MultiCurrencyResult)
+async def calculate_all_currencies_endpoint(
+    prop: PropertyInput,
+    currency: Optional[list[str]] = Query(default=None, description="Currencies to return"),
+):
+    """
+    Calculate costs once and return them in several currencies.
+
+    Defaults to the commonly used currencies plus the requested source
+    currency. Lets the frontend switch display currency without another
+    request.
+    """
+    currencies = [c.upper() for c in currency] if currency else list(SUPPORTED_CURRENCIES)
+    if prop.source_currency not in currencies:
+        currencies.append(prop.source_currency)
+
+    rates = await fetch_exchange_rates("EUR")
+    _require_currencies(rates, currencies)
+    return MultiCurrencyResult(
+        rates=rates,
+        results=calculate_all_currencies(prop, rates, currencies),
+    )
+
+
+@app.post("/api/calculate/batch", response_model=BatchCalculationResult)
+async def calculate_batch_endpoint(props: list[PropertyInput]):
+    """
+    Calculate costs for many properties in one request.
+
+    All rows share a single exchange-rate snapshot. Results are returned in
+    input order, with line item amounts aligned to one_time_items/annual_items.
+    """
+    if not props:
+        raise HTTPException(status_code=400, detail="Please provide at least 1 property")
+    if len(props) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_BATCH_SIZE} properties per batch")
+
+    cross = await fetch_cross_rates()
+    _require_currencies(cross.currencies, (p.source_currency for p in props))
+    cols = PropertyColumns.from_inputs(props)
+    costs = calculate_columns(cols)
+    fx = exchange_rates_for(cols, cross)
+
+    one_time = costs.total_one_time
+    annual = costs.total_annual
+    grand = costs.grand_total_first_year
+
+    # Every row's totals in its own currency in one conversion
+    one_time_fx, annual_fx, grand_fx = cross.convert(
+        np.stack((one_time, annual, grand)), "EUR", cols.currency
+    )
+
+    results = []
+    for i in range(len(costs)):
+        rate = None if np.isnan(fx[i]) else float(fx[i])
+        results.append(BatchCalculationRow(
+            purchase_price_eur=float(costs.purchase_price[i]),
+            cadastral_value=float(costs.cadastral_value[i]),
+            exchange_rate=rate,
+            one_time_items_eur=costs.one_time[i].tolist(),
+            annual_items_eur=costs.annual[i].tolist(),
+            total_one_time_eur=float(one_time[i]),
+            total_one_time_foreign=float(one_time_fx[i]) if rate else None,
+            total_annual_eur=float(annual[i]),
+            total_annual_foreign=float(annual_fx[i]) if rate else None,
+            grand_total_first_year_eur=float(grand[i]),
+            grand_total_first_year_foreign=float(grand_fx[i]) if rate else None,
+            one_time_percentage=float(costs.one_time_percentage[i]),
+        ))
+
+    return BatchCalculationResult(
+        count=len(results),
+        rates=cross.row("EUR"),
+        one_time_items=list(ONE_TIME_ITEMS),
+        annual_items=list(ANNUAL_ITEMS),
+        results=results,
+    )
+
+
+def _grid_axis_values(axis: Optional[GridAxis], default: float) -> np.ndarray:
+    """Expand a grid axis, or fall back to a single base value."""
+    if axis is None:
+        return np.array([default])
+    return np.linspace(axis.start, axis.stop, axis.steps)
+
+
+@app.post("/api/calculate/grid", response_model=SensitivityGridResult)
+async def calculate_sensitivity_grid(request: SensitivityGridRequest):
+    """
+    Calculate totals over a grid of purchase price, cadastral income and mortgage amount.
+
+    Returns the whole grid in one columnar payload instead of one calculation per cell.
+    """
+    base = request.base
+    prices = _grid_axis_values(request.purchase_price, base.purchase_price)
+    incomes = _grid_axis_values(request.cadastral_income, base.cadastral_income or 0)
+    # A swept mortgage amount is the loan size, with 0 meaning no mortgage
+    mortgages = _grid_axis_values(request.mortgage_amount, base.mortgage_amount or 0)
+
+    if prices.min() <= 0:
+        raise HTTPException(status_code=400, detail="Purchase price range must be greater than 0")
+    shape = [len(prices), len(incomes), len(mortgages)]
+    if prices.size * incomes.size * mortgages.size > MAX_GRID_CELLS:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_GRID_CELLS} grid cells per request")
+
+    costs = calculate_grid(base, prices, incomes, mortgages if request.mortgage_amount else None)
+
+    return SensitivityGridResult(
+        purchase_price=prices.tolist(),
+        cadastral_income=incomes.tolist(),
+        mortgage_amount=mortgages.tolist(),
+        shape=shape,
+        total_one_time_eur=costs.total_one_time.tolist(),
+        total_annual_eur=costs.total_annual.tolist(),
+        grand_total_first_year_eur=costs.grand_total_first_year.tolist(),
+    )
+
+
+@app.post("/api/calculate/projection", response_model=ProjectionResult)
+async def calculate_projection(request: ProjectionRequest):
+    """
+    Project total cost of ownership over 1-50 years.
+
+    Annual costs escalate per item, mortgage interest follows the outstanding
+    balance, and foreign totals follow an exchange-rate path.
+    """
+    if len(request.properties) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_BATCH_SIZE} properties per batch")
+
+    options = {
+        "years": request.years,
+        "escalation": request.escalation,
+        "fx_drift": request.fx_drift,
+        "fx_path": tuple(request.fx_path) if request.fx_path is not None else None,
+    }
+    if request.mortgage_rate is not None:
+        options["mortgage_rate"] = request.mortgage_rate
+    if request.mortgage_term_years is not None:
+        options["mortgage_term_years"] = request.mortgage_term_years
+    try:
+        assumptions = ProjectionAssumptions(**options)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cross = await fetch_cross_rates()
+    _require_currencies(cross.currencies, (p.source_currency for p in request.properties))
+    cols = PropertyColumns.from_inputs(request.properties)
+    projection = project_ownership(
+        calculate_columns(cols),
+        mortgage_principal(cols),
+        exchange_rates_for(cols, cross),
+        assumptions,
+    )
+
+    annual_total = projection.annual_total
+    projections = []
+    for i in range(len(request.properties)):
+        foreign = not np.isnan(projection.fx_rate[i, 0])
+        projections.append(PropertyProjection(
+            annual_items_eur=projection.annual_items[i].tolist(),
+            annual_total_eur=annual_total[i].tolist(),
+            mortgage_payment_eur=projection.mortgage_payment[i].tolist(),
+            mortgage_interest_eur=projection.mortgage_interest[i].tolist(),
+            mortgage_balance_eur=projection.mortgage_balance[i].tolist(),
+            cumulative_cost_eur=projection.cumulative_cost[i].tolist(),
+            fx_rate=projection.fx_rate[i].tolist() if foreign else None,
+            cumulative_cost_foreign=(
+                (projection.cumulative_cost[i] * projection.fx_rate[i]).tolist() if foreign else None
+            ),
+        ))
+
+    return ProjectionResult(
+        years=projection.years.tolist(),
+        annual_items=list(ANNUAL_ITEMS),
+        projections=projections,
+    )
+
+
+def _percentile_range(values: np.ndarray) -> PercentileRange:
+    p10, p50, p90 = values.tolist()
+    return PercentileRange(p10=p10, p50=p50, p90=p90)
+
+
+@app.post("/api/calculate/uncertainty", response_model=UncertaintyResult)
+def calculate_uncertainty(request: UncertaintyRequest):
+    """
+    Estimate cost uncertainty by sampling the min/max ranges in the rate tables.
+
+    Returns P10/P50/P90 per line item and for the totals. A plain def so the
+    sampling runs in the threadpool instead of blocking the event loop.
+    """
+    if len(request.properties) * request.draws > MAX_UNCERTAINTY_SAMPLES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {MAX_UNCERTAINTY_SAMPLES} samples (properties x draws) per request",
+        )
+
+    sim = simulate_batch(request.properties, request.draws, request.seed)
+
+    results = [
+        PropertyUncertainty(
+            one_time_items_eur=[_percentile_range(col) for col in sim.one_time[i].T],
+            annual_items_eur=[_percentile_range(col) for col in sim.annual[i].T],
+            total_one_time_eur=_percentile_range(sim.total_one_time[i]),
+            total_annual_eur=_percentile_range(sim.total_annual[i]),
+            grand_total_first_year_eur=_percentile_range(sim.grand_total_first_year[i]),
+        )
+        for i in range(len(request.properties))
+    ]
+
+    return UncertaintyResult(
+        draws=request.draws,
+        one_time_items=list(ONE_TIME_ITEMS),
+        annual_items=list(ANNUAL_ITEMS),
+        results=results,
+    )
+
+
+@app.post("/api/calculate/max-price", response_model=BudgetSolveResult)
+async def solve_budget(request: BudgetSolveRequest):
+    """
+    Find the largest purchase price whose price plus one-time costs fits each budget.
+
+    Solves every budget in closed form over the piecewise-linear cost rules.
+    """
+    if len(request.budgets) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_BATCH_SIZE} budgets per request")
+
+    budgets = np.array(request.budgets, dtype=float)
+    prices = solve_max_price(request.options, budgets)
+
+    feasible = ~np.isnan(prices)
+    one_time = np.full(len(prices), np.nan)
+    if feasible.any():
+        one_time[feasible] = all_in_cost(request.options, prices[feasible]) - prices[feasible]
+
+    return BudgetSolveResult(results=[
+        BudgetSolution(
+            budget_eur=budget,
+            max_purchase_price_eur=float(price) if ok else None,
+            total_one_time_eur=float(cost) if ok else None,
+        )
+        for budget, price, cost, ok in zip(request.budgets, prices, one_time, feasible)
+    ])
+
+
+@app.post("/api/calculate/history", response_model=HistoricalReprice)
+async def reprice_history(request: HistoricalRepriceRequest):
+    """
+    Reprice a calculation result with each day's historical exchange rate.
+
+    Shows what the same EUR costs would have been in a foreign currency on
+    every trading day in the range. Only the exchange rate changes.
+    """
+    if request.end_date < request.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+
+    currency = request.currency or request.result.source_currency
+    if currency == "EUR":
+        raise HTTPException(status_code=400, detail="Please choose a foreign currency")
+
+    history = get_history().between(request.start_date, request.end_date)
+    if currency not in history.currencies:
+        raise HTTPException(status_code=404, detail=f"No historical rates for {currency}")
+    rates = history.column(currency)
+    known = ~np.isnan(rates)
+    if not known.any():
+        raise HTTPException(status_code=404, detail="No historical rates for this date range")
+
+    result = request.result
+    totals_eur = np.array([
+        result.purchase_price_eur,
+        result.total_one_time_eur,
+        result.total_annual_eur,
+        result.grand_total_first_year_eur,
+    ])
+    price, one_time, annual, grand = totals_eur[:, None] * rates[known][None, :]
+
+    return HistoricalReprice(
+        currency=currency,
+        dates=history.dates[known].tolist(),
+        exchange_rate=rates[known].tolist(),
+        purchase_price_foreign=price.tolist(),
+        total_one_time_foreign=one_time.tolist(),
+        total_annual_foreign=annual.tolist(),
+        grand_total_first_year_foreign=grand.tolist(),
+    )
+
+
+def _mortgage_terms(loans: list[MortgageInput]) -> list[MortgageTerms]:
+    """Validate batch size and convert request loans to MortgageTerms."""
+    if not loans:
+        raise HTTPException(status_code=400, detail="Please provide at least 1 loan")
+    if len(loans) > MAX_MORTGAGE_BATCH:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_MORTGAGE_BATCH} loans per request")
+    return [
+        MortgageTerms(
+            principal=loan.mortgage_amount,
+            annual_rate=loan.annual_rate,
+            term_years=loan.term_years,
+            variable=loan.mortgage_type == MortgageType.VARIABLE,
+            rate_path=tuple(loan.rate_path) if loan.rate_path else None,
+        )
+        for loan in loans
+    ]
+
+
+@app.post("/api/mortgage/schedule")
+async def mortgage_schedule(loans: list[MortgageInput], format: Literal["ndjson", "csv"] = "ndjson"):
+    """
+    Stream monthly amortization schedules for one or more loans.
+
+    Rows are generated lazily and sent as NDJSON or CSV, tagged with the
+    loan's index in the request.
+    """
+    terms = _mortgage_terms(loans)
+    if format == "csv":
+        return StreamingResponse(
+            stream_csv(terms),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=amortization.csv"},
+        )
+    return StreamingResponse(stream_ndjson(terms), media_type="application/x-ndjson")
+
+
+@app.post("/api/mortgage/summary", response_model=list[MortgageSummary])
+async def mortgage_summaries(loans: list[MortgageInput]):
+    """Monthly payment and total interest per loan, without building schedules."""
+    return [MortgageSummary(**mortgage_summary(t)) for t in _mortgage_terms(loans)]
+
+
 @app.get("/api/rates", response_model=ExchangeRates)
-async def get_exchange_rates():
+async def get_exchange_rates(request: Request, response: Response):
     """
     Get current exchange rates.
 
-    Rates are cached for 15 minutes.
+    Rates are refreshed in the background and cached for 15 minutes;
+    age_seconds reports how old the returned snapshot is. The ETag is the
+    snapshot version, so clients can revalidate with If-None-Match.
     """
     info = await get_rate_info()
+    etag = f'W/"rates-{info["version"]}"'
+    if info["version"] and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    if info["version"]:
+        response.headers["ETag"] = etag
     return ExchangeRates(
         base=info["base"],
         rates=info["rates"],
-        date=info["date"]
+        date=info["date"],
+        age_seconds=info["age_seconds"],
+        stale=info["stale"],
+        fetched_at=info["fetched_at"],
+        source=info["source"],
+        version=info["version"],
     )
 
 
@@ -141,6 +547,16 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/api/stats")
+async def get_stats():
+    """Runtime cache, upstream and connection pool counters for monitoring."""
+    return {
+        "calculation_cache": get_result_cache_stats(),
+        "exchange_rates": get_fetch_stats(),
+        "http_clients": clients.stats(),
+    }
+
+
 # =============================================================================
 # Property Listing Translator Endpoints
 # =============================================================================
@@ -430,39 +846,119 @@ async def api_professionals_regions():
     return {"regions": get_regions_with_professionals()}
 
 
-@app.get("/api/professionals", response_model=ProfessionalSearchResponse)
+@app.get("/api/professionals/autocomplete", response_model=AutocompleteResponse)
+async def api_autocomplete_professionals(
+    response: Response,
+    q: str = Query(..., max_length=100),
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS),
+):
+    """
+    Suggest professionals, cities, services and regions as the user types.
+
+    Matches the start of any word, ignoring case and accents. The directory
+    only changes on deploy, so responses may be cached per prefix.
+    """
+    suggestions = get_autocomplete().lookup(q, limit)
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return AutocompleteResponse(
+        query=q,
+        suggestions=[
+            AutocompleteSuggestion(type=s.type, id=s.id, label=s.label) for s in suggestions
+        ],
+    )
+
+
+# Fields every professional has, with the defaults of optional ones
+PROFESSIONAL_DEFAULTS = {
+    name: None if field.is_required() else field.default
+    for name, field in Professional.model_fields.items()
+}
+
+
+def _professional_fields(fields: Optional[str]) -> list[str]:
+    """Parse a comma-separated fields= value; id is always included."""
+    if not fields:
+        return list(PROFESSIONAL_DEFAULTS)
+    requested = ["id"] + [f.strip() for f in fields.split(",") if f.strip() and f.strip() != "id"]
+    for name in requested:
+        if name not in PROFESSIONAL_DEFAULTS:
+            raise HTTPException(status_code=400, detail=f"Unknown field: {name}")
+    return list(dict.fromkeys(requested))
+
+
+@app.get(
+    "/api/professionals",
+    response_model=ProfessionalSearchResponse,
+    response_model_exclude_unset=True,
+)
 async def api_search_professionals(
     category: str = None,
     region: str = None,
     featured: bool = False,
     verified: bool = False,
+    language: str = None,
+    q: str = None,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    facets: bool = False,
 ):
     """
-    Search professionals with optional filters.
+    Search professionals with optional filters and free text.
+
+    q searches names, descriptions, services, highlights and cities
+    (accents and simple plurals don't matter), best matches first.
 
     Filters:
     - category: Filter by category ID (lawyer, notary, geometra, etc.)
     - region: Filter by region ID (toscana, umbria, etc.)
     - featured: Only show featured professionals
     - verified: Only show verified professionals
+    - language: Only show professionals speaking this language (e.g. German)
+
+    Paging and projection:
+    - limit: Page size; without it every match is returned
+    - cursor: next_cursor from the previous page of the same search
+    - fields: Comma-separated fields to return (id is always included),
+      e.g. fields=name,category,regions for list views
+    - facets: Also count matches per category, region, language, featured
+      and verified value, each under the other active filters
     """
-    results = search_professionals(
-        category=category,
-        region=region,
-        featured_only=featured,
-        verified_only=verified,
-    )
+    selected = _professional_fields(fields)
+    try:
+        page = search_professionals_page(
+            category=category,
+            region=region,
+            featured_only=featured,
+            verified_only=verified,
+            language=language,
+            q=q,
+            limit=limit,
+            after=Cursor.decode(cursor) if cursor else None,
+            facets=facets,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return ProfessionalSearchResponse(
-        professionals=[Professional(**p) for p in results],
-        total=len(results),
+    response = ProfessionalSearchResponse(
+        professionals=[
+            ProfessionalFields(**{name: p.get(name, PROFESSIONAL_DEFAULTS[name]) for name in selected})
+            for p in page.entries
+        ],
+        total=page.total,
         filters_applied={
             "category": category,
             "region": region,
             "featured": featured,
             "verified": verified,
-        }
+            "language": language,
+            "q": q,
+        },
+        next_cursor=page.next.encode() if page.next else None,
     )
+    if page.facets is not None:
+        response.facets = ProfessionalFacets(**page.facets)
+    return response
 
 
 @app.get("/api/professionals/{professional_id}", response_model=Professional)
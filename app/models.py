@@ -2,17 +2,14 @@
 Pydantic models for input validation and output structure.
 """
 
-from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional, Literal
+from pydantic import BaseModel, Field, HttpUrl, StringConstraints, create_model
+from typing import Annotated, Optional, Literal
+from datetime import date, datetime
 from enum import Enum
 
 
-class Currency(str, Enum):
-    EUR = "EUR"
-    USD = "USD"
-    CAD = "CAD"
-    GBP = "GBP"
-    AUD = "AUD"
+# ISO 4217 code; any currency the rate provider offers is accepted
+CurrencyCode = Annotated[str, StringConstraints(to_upper=True, pattern=r"^[A-Za-z]{3}$")]
 
 
 class PropertyType(str, Enum):
@@ -26,12 +23,16 @@ class SellerType(str, Enum):
     DEVELOPER = "developer"
 
 
-class PropertyInput(BaseModel):
-    """Input model for property purchase calculation."""
+class MortgageType(str, Enum):
+    FIXED = "fixed"
+    VARIABLE = "variable"
+
+
+class PurchaseOptions(BaseModel):
+    """Property and buyer options for a purchase, independent of the price."""
 
     # Property details
-    purchase_price: float = Field(..., gt=0, description="Purchase price in EUR")
-    source_currency: Currency = Field(default=Currency.EUR, description="User's preferred currency")
+    source_currency: CurrencyCode = Field(default="EUR", description="User's preferred currency (ISO 4217 code)")
     property_type: PropertyType = Field(default=PropertyType.RESIDENTIAL)
     cadastral_category: Optional[str] = Field(default=None, description="e.g., A/2, A/3, etc.")
     cadastral_income: Optional[float] = Field(default=None, ge=0, description="Annual cadastral income in EUR")
@@ -54,6 +55,12 @@ class PropertyInput(BaseModel):
     monthly_condo_fee: Optional[float] = Field(default=None, ge=0)
 
 
+class PropertyInput(PurchaseOptions):
+    """Input model for property purchase calculation."""
+
+    purchase_price: float = Field(..., gt=0, description="Purchase price in EUR")
+
+
 class CostItem(BaseModel):
     """Individual cost line item."""
     name: str
@@ -107,11 +114,204 @@ class CalculationResult(BaseModel):
     notes: list[str] = []
 
 
+class MultiCurrencyResult(BaseModel):
+    """One calculation projected into several currencies."""
+    rates: dict[str, float]
+    results: dict[str, CalculationResult]
+
+
+class BatchCalculationRow(BaseModel):
+    """Totals and line item amounts for one property in a batch."""
+    purchase_price_eur: float
+    cadastral_value: float
+    exchange_rate: Optional[float] = None
+    one_time_items_eur: list[float]
+    annual_items_eur: list[float]
+    total_one_time_eur: float
+    total_one_time_foreign: Optional[float] = None
+    total_annual_eur: float
+    total_annual_foreign: Optional[float] = None
+    grand_total_first_year_eur: float
+    grand_total_first_year_foreign: Optional[float] = None
+    one_time_percentage: float
+
+
+class BatchCalculationResult(BaseModel):
+    """Batch calculation result, rows in input order."""
+    count: int
+    rates: dict[str, float]
+    one_time_items: list[str]
+    annual_items: list[str]
+    results: list[BatchCalculationRow]
+
+
+class GridAxis(BaseModel):
+    """Evenly spaced values for one axis of a sensitivity grid."""
+    start: float = Field(..., ge=0)
+    stop: float = Field(..., ge=0)
+    steps: int = Field(default=10, ge=1, le=100)
+
+
+class SensitivityGridRequest(BaseModel):
+    """Base property plus the axes to vary. Omitted axes keep the base value."""
+    base: PropertyInput
+    purchase_price: Optional[GridAxis] = None
+    cadastral_income: Optional[GridAxis] = None
+    mortgage_amount: Optional[GridAxis] = None
+
+
+class SensitivityGridResult(BaseModel):
+    """
+    Sensitivity grid in columnar form.
+
+    Totals are flat lists in row-major order over
+    (purchase_price, cadastral_income, mortgage_amount); shape gives the axis lengths.
+    """
+    purchase_price: list[float]
+    cadastral_income: list[float]
+    mortgage_amount: list[float]
+    shape: list[int]
+    total_one_time_eur: list[float]
+    total_annual_eur: list[float]
+    grand_total_first_year_eur: list[float]
+
+
+class ProjectionRequest(BaseModel):
+    """Multi-year ownership projection for one or more properties."""
+    properties: list[PropertyInput] = Field(..., min_length=1)
+    years: int = Field(default=10, ge=1, le=50)
+    escalation: dict[str, float] = Field(
+        default_factory=dict,
+        description="Annual escalation per item key (imu, tari, condominium, utilities)"
+    )
+    mortgage_rate: Optional[float] = Field(default=None, ge=0, le=0.25, description="Annual mortgage rate")
+    mortgage_term_years: Optional[int] = Field(default=None, ge=1, le=40)
+    fx_drift: float = Field(default=0.0, gt=-1, description="Annual change in the EUR exchange rate")
+    fx_path: Optional[list[float]] = Field(
+        default=None,
+        description="Per-year multipliers on today's exchange rate (overrides fx_drift)"
+    )
+
+
+class PropertyProjection(BaseModel):
+    """Year-indexed series for one property (one value per projected year)."""
+    annual_items_eur: list[list[float]]
+    annual_total_eur: list[float]
+    mortgage_payment_eur: list[float]
+    mortgage_interest_eur: list[float]
+    mortgage_balance_eur: list[float]
+    cumulative_cost_eur: list[float]
+    fx_rate: Optional[list[float]] = None
+    cumulative_cost_foreign: Optional[list[float]] = None
+
+
+class ProjectionResult(BaseModel):
+    """Ownership projections, in the same order as the request."""
+    years: list[int]
+    annual_items: list[str]
+    projections: list[PropertyProjection]
+
+
+class MortgageInput(BaseModel):
+    """Loan terms for an amortization schedule or summary."""
+    mortgage_amount: float = Field(..., gt=0, description="Loan amount in EUR")
+    annual_rate: float = Field(..., ge=0, le=0.25, description="Annual interest rate (e.g., 0.035 for 3.5%)")
+    term_years: int = Field(default=25, ge=1, le=40)
+    mortgage_type: MortgageType = Field(default=MortgageType.FIXED)
+    rate_path: Optional[list[float]] = Field(
+        default=None,
+        description="Variable only: annual rate for each loan year, last value persists"
+    )
+
+
+class MortgageSummary(BaseModel):
+    """Closed-form loan totals."""
+    monthly_payment: float
+    total_interest: float
+    total_paid: float
+    months: int
+
+
+class UncertaintyRequest(BaseModel):
+    """Monte Carlo sampling of the estimate ranges for one or more properties."""
+    properties: list[PropertyInput] = Field(..., min_length=1)
+    draws: int = Field(default=20_000, ge=100, le=100_000)
+    seed: Optional[int] = Field(default=None, description="Fix for reproducible draws")
+
+
+class PercentileRange(BaseModel):
+    """P10/P50/P90 of a simulated amount in EUR."""
+    p10: float
+    p50: float
+    p90: float
+
+
+class PropertyUncertainty(BaseModel):
+    """Percentiles per line item and for the totals of one property."""
+    one_time_items_eur: list[PercentileRange]
+    annual_items_eur: list[PercentileRange]
+    total_one_time_eur: PercentileRange
+    total_annual_eur: PercentileRange
+    grand_total_first_year_eur: PercentileRange
+
+
+class UncertaintyResult(BaseModel):
+    """Uncertainty results, in the same order as the request."""
+    draws: int
+    one_time_items: list[str]
+    annual_items: list[str]
+    results: list[PropertyUncertainty]
+
+
+class BudgetSolveRequest(BaseModel):
+    """All-in cash budgets to solve for the maximum purchase price."""
+    budgets: list[float] = Field(..., min_length=1, description="Total budgets in EUR")
+    options: PurchaseOptions = Field(default_factory=PurchaseOptions)
+
+
+class BudgetSolution(BaseModel):
+    """Largest purchase price whose price plus one-time costs fits a budget."""
+    budget_eur: float
+    max_purchase_price_eur: Optional[float] = None
+    total_one_time_eur: Optional[float] = None
+
+
+class BudgetSolveResult(BaseModel):
+    """Solutions in the same order as the requested budgets."""
+    results: list[BudgetSolution]
+
+
+class HistoricalRepriceRequest(BaseModel):
+    """Reprice an existing result with each day's historical exchange rate."""
+    result: CalculationResult
+    start_date: date
+    end_date: date
+    currency: Optional[CurrencyCode] = Field(
+        default=None, description="Defaults to the result's source currency"
+    )
+
+
+class HistoricalReprice(BaseModel):
+    """Foreign-currency totals per trading day, aligned with dates."""
+    currency: str
+    dates: list[date]
+    exchange_rate: list[float]
+    purchase_price_foreign: list[float]
+    total_one_time_foreign: list[float]
+    total_annual_foreign: list[float]
+    grand_total_first_year_foreign: list[float]
+
+
 class ExchangeRates(BaseModel):
     """Exchange rates response."""
     base: str = "EUR"
     rates: dict[str, float]
     date: str
+    age_seconds: Optional[float] = None  # None when serving fallback rates
+    stale: bool = False
+    fetched_at: Optional[datetime] = None
+    source: Optional[str] = None
+    version: int = 0  # Snapshot version; 0 for the fallback rates
 
 
 class TaxRatesResponse(BaseModel):
@@ -312,6 +512,19 @@ class Professional(BaseModel):
     source: Optional[str] = None
 
 
+# Built from Professional so the two field lists can't drift apart
+ProfessionalFields = create_model(
+    "ProfessionalFields",
+    __doc__="""
+    Professional listing restricted to requested fields.
+
+    Every field is optional. Used with response_model_exclude_unset so fields
+    that were not requested are left out of the response rather than sent as null.
+    """,
+    **{name: (Optional[field.annotation], None) for name, field in Professional.model_fields.items()},
+)
+
+
 class ProfessionalSearchParams(BaseModel):
     """Search parameters for professionals."""
     category: Optional[str] = None
@@ -320,8 +533,37 @@ class ProfessionalSearchParams(BaseModel):
     verified_only: bool = False
 
 
+class ProfessionalFacets(BaseModel):
+    """
+    Match counts per filter value.
+
+    Each facet is counted with every other active filter applied but not
+    its own, so the counts show what picking another value would return.
+    """
+    category: dict[str, int]
+    region: dict[str, int]
+    language: dict[str, int]
+    featured: dict[str, int]  # "true" / "false"
+    verified: dict[str, int]  # "true" / "false"
+
+
 class ProfessionalSearchResponse(BaseModel):
     """Response for professional search."""
-    professionals: list[Professional]
+    professionals: list[ProfessionalFields]
     total: int
     filters_applied: dict
+    next_cursor: Optional[str] = None  # Pass as cursor= for the next page
+    facets: Optional[ProfessionalFacets] = None
+
+
+class AutocompleteSuggestion(BaseModel):
+    """A typeahead suggestion for the professionals search box."""
+    type: Literal["professional", "city", "service", "region"]
+    id: str  # Professional or region ID; the name itself for cities and services
+    label: str
+
+
+class AutocompleteResponse(BaseModel):
+    """Typeahead suggestions for a prefix."""
+    query: str
+    suggestions: list[AutocompleteSuggestion]
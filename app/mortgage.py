@@ -0,0 +1,206 @@
+"""
+Mortgage amortization for Italian purchase loans.
+
+Schedules are produced lazily, one month at a time, so a 30-year schedule
+(or thousands of them) can be streamed without materializing every row.
+Summaries use the closed-form annuity formulas and never build rows.
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass, astuple, fields
+from typing import Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class AmortizationRow:
+    """One monthly payment."""
+    month: int
+    annual_rate: float
+    payment: float
+    interest: float
+    principal: float
+    balance: float
+
+
+@dataclass(frozen=True)
+class MortgageTerms:
+    """
+    Loan terms.
+
+    A variable mortgage is re-priced at the start of each year using
+    rate_path[year - 1]; the last value persists once the path runs out.
+    Without a path, or for a fixed mortgage, annual_rate applies throughout.
+    """
+    principal: float
+    annual_rate: float
+    term_years: int
+    variable: bool = False
+    rate_path: Optional[tuple[float, ...]] = None
+
+    @property
+    def months(self) -> int:
+        return self.term_years * 12
+
+    def rate_for_year(self, year: int) -> float:
+        """Annual rate in effect during a (1-based) loan year."""
+        if not self.variable or not self.rate_path:
+            return self.annual_rate
+        return self.rate_path[min(year, len(self.rate_path)) - 1]
+
+
+def monthly_payment(principal: float, annual_rate: float, months: int) -> float:
+    """Level payment that repays principal over months at annual_rate."""
+    i = annual_rate / 12
+    if i == 0:
+        return principal / months
+    return principal * i / (1 - (1 + i) ** -months)
+
+
+def amortization_schedule(terms: MortgageTerms) -> Iterator[AmortizationRow]:
+    """
+    Yield the monthly schedule lazily.
+
+    Variable mortgages recompute the payment on the remaining balance and
+    remaining months whenever the rate changes.
+    """
+    balance = terms.principal
+    rate = None
+    payment = 0.0
+
+    for month in range(1, terms.months + 1):
+        year_rate = terms.rate_for_year((month - 1) // 12 + 1)
+        if year_rate != rate:
+            rate = year_rate
+            payment = monthly_payment(balance, rate, terms.months - month + 1)
+
+        interest = balance * rate / 12
+        principal = payment - interest
+        if month == terms.months:
+            # Absorb rounding drift in the final payment
+            principal = balance
+        balance -= principal
+
+        yield AmortizationRow(
+            month=month,
+            annual_rate=rate,
+            payment=interest + principal,
+            interest=interest,
+            principal=principal,
+            balance=max(balance, 0.0),
+        )
+
+
+def mortgage_summary(terms: MortgageTerms) -> dict:
+    """
+    Monthly payment, total interest and total paid without generating rows.
+
+    Fixed loans use the annuity formula directly. Variable loans step one
+    year at a time using the closed-form balance after 12 payments.
+    """
+    first_payment = monthly_payment(terms.principal, terms.rate_for_year(1), terms.months)
+
+    if not terms.variable or not terms.rate_path:
+        total_paid = first_payment * terms.months
+    else:
+        balance = terms.principal
+        total_paid = 0.0
+        for year in range(1, terms.term_years + 1):
+            remaining = terms.months - (year - 1) * 12
+            rate = terms.rate_for_year(year)
+            i = rate / 12
+            payment = monthly_payment(balance, rate, remaining)
+            total_paid += payment * 12
+            growth = (1 + i) ** 12
+            balance = balance * growth - (payment * (growth - 1) / i if i else payment * 12)
+
+    return {
+        "monthly_payment": first_payment,
+        "total_interest": total_paid - terms.principal,
+        "total_paid": total_paid,
+        "months": terms.months,
+    }
+
+
+def mortgage_balances(
+    principal: np.ndarray,
+    annual_rate: float,
+    term_years: int,
+    months: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Monthly payment and outstanding balance after the given months elapsed.
+
+    Vectorized fixed-rate form: principal has shape (n,) and months any
+    shape m; the balance has shape (n, *m).
+    """
+    n_months = term_years * 12
+    i = annual_rate / 12
+    p = principal.reshape(principal.shape + (1,) * months.ndim)
+    k = np.minimum(months, n_months)
+
+    if i == 0:
+        payment = principal / n_months
+        balance = p - payment.reshape(p.shape) * k
+    else:
+        payment = principal * i / (1 - (1 + i) ** -n_months)
+        growth = (1 + i) ** k
+        balance = p * growth - payment.reshape(p.shape) * (growth - 1) / i
+
+    return payment, np.maximum(balance, 0.0)
+
+
+# Columns written for each streamed row
+SCHEDULE_COLUMNS = ("loan",) + tuple(f.name for f in fields(AmortizationRow))
+
+# Rows buffered per streamed chunk
+_CHUNK_ROWS = 500
+
+
+def _rounded(row: AmortizationRow) -> tuple:
+    month, rate, *amounts = astuple(row)
+    return (month, rate, *(round(a, 2) for a in amounts))
+
+
+def _schedules(loans: Sequence[MortgageTerms]) -> Iterator[tuple]:
+    for loan_index, terms in enumerate(loans):
+        for row in amortization_schedule(terms):
+            yield (loan_index, *_rounded(row))
+
+
+def _chunked(lines: Iterable[str]) -> Iterator[str]:
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= _CHUNK_ROWS:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_ndjson(loans: Sequence[MortgageTerms]) -> Iterator[str]:
+    """Schedules for every loan as newline-delimited JSON, in chunks."""
+    return _chunked(
+        json.dumps(dict(zip(SCHEDULE_COLUMNS, values))) + "\n"
+        for values in _schedules(loans)
+    )
+
+
+def stream_csv(loans: Sequence[MortgageTerms]) -> Iterator[str]:
+    """Schedules for every loan as CSV with a header row, in chunks."""
+    def lines() -> Iterator[str]:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(SCHEDULE_COLUMNS)
+        for values in _schedules(loans):
+            writer.writerow(values)
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+        yield out.getvalue()
+
+    return _chunked(lines())
@@ -0,0 +1,373 @@
+"""
+Precompiled calculation plans.
+
+The tax rules in app/data/rates.py branch on seller type, prima casa status
+and luxury category. Instead of re-walking that branch tree on every request,
+the rules are compiled at import time into one immutable plan per scenario.
+Each plan is a flat list of steps: fixed items are pre-built once, and only
+price- and size-dependent items are computed per request.
+"""
+
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Callable, Optional, Union
+
+from app.models import PropertyInput, CostItem
+from app.data.rates import (
+    REGISTRATION_TAX,
+    VAT_RATES,
+    LUXURY_CATEGORIES,
+    MORTGAGE_TAX,
+    CADASTRAL_TAX,
+    AGENCY_COMMISSION,
+    PROFESSIONAL_FEES,
+    MORTGAGE_FEES,
+    CURRENCY_CONVERSION_SPREAD,
+    IMU_RATES,
+    TARI_RATES,
+    UTILITY_ESTIMATES,
+)
+from app.schedules import NOTARY_FEES
+
+
+# Per-request values are derived from the input and its cadastral value
+Computed = Callable[[PropertyInput, float], float]
+Described = Callable[[PropertyInput, float], str]
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    """
+    One cost line in a plan.
+
+    When both amount and description are constants the CostItem is built
+    once at compile time and shared by every result that uses this plan.
+    """
+    name: str
+    amount: Union[float, Computed]
+    description: Union[str, Described]
+    is_estimate: bool = False
+    when: Optional[Callable[[PropertyInput], bool]] = None
+    note: Union[None, str, Described] = None
+    item: Optional[CostItem] = field(default=None, init=False, compare=False)
+
+    def __post_init__(self):
+        if not callable(self.amount) and not callable(self.description):
+            object.__setattr__(self, "item", CostItem(
+                name=self.name,
+                amount_eur=self.amount,
+                description=self.description,
+                is_estimate=self.is_estimate,
+            ))
+
+    def build(self, prop: PropertyInput, cadastral_value: float) -> CostItem:
+        """Return the pre-built item, or compute it for this input."""
+        if self.item is not None:
+            return self.item
+        amount = self.amount(prop, cadastral_value) if callable(self.amount) else self.amount
+        description = (
+            self.description(prop, cadastral_value) if callable(self.description) else self.description
+        )
+        return CostItem(
+            name=self.name,
+            amount_eur=amount,
+            description=description,
+            is_estimate=self.is_estimate,
+        )
+
+
+@dataclass(frozen=True)
+class CalculationPlan:
+    """Immutable one-time and annual steps for one scenario."""
+    seller_type: str
+    prima_casa: bool
+    luxury: bool
+    one_time: tuple[PlanStep, ...]
+    annual: tuple[PlanStep, ...]
+
+    def evaluate_one_time(self, prop: PropertyInput, cadastral_value: float) -> tuple[list[CostItem], list[str]]:
+        return _evaluate(self.one_time, prop, cadastral_value)
+
+    def evaluate_annual(self, prop: PropertyInput, cadastral_value: float) -> tuple[list[CostItem], list[str]]:
+        return _evaluate(self.annual, prop, cadastral_value)
+
+
+def _evaluate(
+    steps: tuple[PlanStep, ...],
+    prop: PropertyInput,
+    cadastral_value: float
+) -> tuple[list[CostItem], list[str]]:
+    """Run a flat list of steps, skipping those whose input toggle is off."""
+    items = []
+    notes = []
+    for step in steps:
+        if step.when is not None and not step.when(prop):
+            continue
+        items.append(step.build(prop, cadastral_value))
+        if step.note is not None:
+            notes.append(step.note(prop, cadastral_value) if callable(step.note) else step.note)
+    return items, notes
+
+
+def _property_size(prop: PropertyInput) -> float:
+    return prop.property_size_sqm or 100  # Default 100 sqm if not specified
+
+
+def _mortgage_amount(prop: PropertyInput) -> float:
+    return prop.mortgage_amount or (prop.purchase_price * 0.7)
+
+
+def _agency_rate(prop: PropertyInput) -> float:
+    return prop.agency_rate or AGENCY_COMMISSION["rate"]
+
+
+def _agency_commission(prop: PropertyInput, vat_rate: float) -> float:
+    commission_base = prop.purchase_price * _agency_rate(prop)
+    return commission_base + commission_base * vat_rate
+
+
+def _tax_steps(seller_type: str, prima_casa: bool, luxury: bool) -> list[PlanStep]:
+    """Registration tax, VAT, mortgage tax and cadastral tax for a scenario."""
+    if seller_type == "developer":
+        if luxury:
+            vat_rate, vat_desc = VAT_RATES["luxury"], "22% VAT on luxury property"
+        elif prima_casa:
+            vat_rate, vat_desc = VAT_RATES["prima_casa"], "4% VAT (prima casa rate)"
+        else:
+            vat_rate, vat_desc = VAT_RATES["second_home"], "10% VAT (second home rate)"
+
+        return [
+            PlanStep(
+                name="Registration Tax (Imposta di Registro)",
+                amount=REGISTRATION_TAX["from_developer"],
+                description="Fixed fee when buying from developer",
+            ),
+            PlanStep(
+                name="VAT (IVA)",
+                amount=lambda prop, cv: prop.purchase_price * vat_rate,
+                description=vat_desc,
+                note="VAT applies because purchasing from developer/company",
+            ),
+            PlanStep(
+                name="Mortgage Tax (Imposta Ipotecaria)",
+                amount=MORTGAGE_TAX["from_developer"],
+                description="Fixed fee when buying from developer",
+            ),
+            PlanStep(
+                name="Cadastral Tax (Imposta Catastale)",
+                amount=CADASTRAL_TAX["from_developer"],
+                description="Fixed fee when buying from developer",
+            ),
+        ]
+
+    # Private seller: taxes based on cadastral value
+    registration_note = (
+        lambda prop, cv: f"Registration tax calculated on cadastral value (€{cv:,.0f}), not purchase price"
+    )
+    if prima_casa:
+        return [
+            PlanStep(
+                name="Registration Tax (Imposta di Registro)",
+                amount=lambda prop, cv: max(
+                    cv * REGISTRATION_TAX["prima_casa_private"], REGISTRATION_TAX["prima_casa_minimum"]
+                ),
+                description="2% of cadastral value (prima casa rate, min €1,000)",
+                note=registration_note,
+            ),
+            PlanStep(
+                name="Mortgage Tax (Imposta Ipotecaria)",
+                amount=MORTGAGE_TAX["prima_casa_private"],
+                description="Fixed €50 for prima casa",
+            ),
+            PlanStep(
+                name="Cadastral Tax (Imposta Catastale)",
+                amount=CADASTRAL_TAX["prima_casa_private"],
+                description="Fixed €50 for prima casa",
+            ),
+        ]
+
+    return [
+        PlanStep(
+            name="Registration Tax (Imposta di Registro)",
+            amount=lambda prop, cv: cv * REGISTRATION_TAX["second_home_private"],
+            description="9% of cadastral value (second home rate)",
+            note=registration_note,
+        ),
+        PlanStep(
+            name="Mortgage Tax (Imposta Ipotecaria)",
+            amount=lambda prop, cv: cv * MORTGAGE_TAX["second_home_private"],
+            description="2% of cadastral value",
+        ),
+        PlanStep(
+            name="Cadastral Tax (Imposta Catastale)",
+            amount=lambda prop, cv: cv * CADASTRAL_TAX["second_home_private"],
+            description="1% of cadastral value",
+        ),
+    ]
+
+
+def _fee_steps(prima_casa: bool) -> list[PlanStep]:
+    """Notary, agency, professional, mortgage and transfer costs."""
+    if prima_casa:
+        mort_reg_rate = MORTGAGE_FEES["registration_tax_prima_casa"]
+        mort_reg_desc = "0.25% of mortgage amount (prima casa rate)"
+    else:
+        mort_reg_rate = MORTGAGE_FEES["registration_tax_second_home"]
+        mort_reg_desc = "2% of mortgage amount"
+
+    spread = CURRENCY_CONVERSION_SPREAD["default"]
+    agency_vat = AGENCY_COMMISSION["vat_rate"]
+
+    return [
+        PlanStep(
+            name="Notary Fees",
+            amount=lambda prop, cv: NOTARY_FEES(prop.purchase_price),
+            description="Based on purchase price, includes deed and searches",
+            is_estimate=True,
+        ),
+        PlanStep(
+            name="Agency Commission",
+            amount=lambda prop, cv: _agency_commission(prop, agency_vat),
+            description=lambda prop, cv: (
+                f"{_agency_rate(prop)*100:.0f}% + 22% VAT = {(_agency_rate(prop) * 1.22)*100:.2f}% effective"
+            ),
+            is_estimate=True,
+            when=lambda prop: prop.include_agency_fee,
+        ),
+        PlanStep(
+            name="Geometra (Surveyor)",
+            amount=PROFESSIONAL_FEES["geometra_default"],
+            description="Technical verification and documentation",
+            is_estimate=True,
+            when=lambda prop: prop.include_geometra,
+        ),
+        PlanStep(
+            name="Technical Reports",
+            amount=PROFESSIONAL_FEES["technical_reports_default"],
+            description="Energy certificate, property checks",
+            is_estimate=True,
+        ),
+        PlanStep(
+            name="Translator",
+            amount=PROFESSIONAL_FEES["translator_default"],
+            description="For deed signing if needed",
+            is_estimate=True,
+            when=lambda prop: prop.include_translator,
+        ),
+        PlanStep(
+            name="Bank Fees",
+            amount=MORTGAGE_FEES["bank_fee_default"],
+            description="Mortgage arrangement fee",
+            is_estimate=True,
+            when=lambda prop: prop.using_mortgage,
+        ),
+        PlanStep(
+            name="Mortgage Registration Tax",
+            amount=lambda prop, cv: _mortgage_amount(prop) * mort_reg_rate,
+            description=mort_reg_desc,
+            when=lambda prop: prop.using_mortgage,
+        ),
+        PlanStep(
+            name="Property Valuation",
+            amount=MORTGAGE_FEES["valuation_fee_default"],
+            description="Bank's property assessment",
+            is_estimate=True,
+            when=lambda prop: prop.using_mortgage,
+        ),
+        PlanStep(
+            name="Currency Transfer Cost",
+            amount=lambda prop, cv: prop.purchase_price * spread,
+            description=f"~{spread*100:.0f}% spread estimate",
+            is_estimate=True,
+            when=lambda prop: prop.source_currency != "EUR",
+            note="Currency transfer cost varies by provider. Specialist services may offer better rates than banks.",
+        ),
+        PlanStep(
+            name="Renovation Budget",
+            amount=lambda prop, cv: prop.renovation_budget,
+            description="User-specified renovation amount",
+            when=lambda prop: bool(prop.renovation_budget),
+        ),
+    ]
+
+
+def _annual_steps(prima_casa: bool, luxury: bool) -> list[PlanStep]:
+    """IMU, TARI, condominium and utilities."""
+    steps = []
+
+    # IMU (Property Tax)
+    if prima_casa and not luxury:
+        steps.append(PlanStep(
+            name="IMU (Property Tax)",
+            amount=0,
+            description="Exempt for prima casa (main residence)",
+            note="Primary residence is exempt from IMU (except luxury categories A/1, A/8, A/9)",
+        ))
+    else:
+        if prima_casa and luxury:
+            imu_rate = IMU_RATES["prima_casa_luxury"]
+            imu_desc = "0.5% of cadastral value (luxury main residence)"
+        else:
+            imu_rate = IMU_RATES["second_home_default"]
+            imu_desc = f"~{imu_rate*100:.2f}% of cadastral value (varies by municipality)"
+        steps.append(PlanStep(
+            name="IMU (Property Tax)",
+            amount=lambda prop, cv: cv * imu_rate,
+            description=imu_desc,
+            is_estimate=True,
+            note="IMU rate varies by municipality (0.76% - 1.06%). Using typical rate of 0.86%",
+        ))
+
+    tari_rate = TARI_RATES["default_per_sqm"]
+    steps.extend([
+        PlanStep(
+            name="TARI (Waste Tax)",
+            amount=lambda prop, cv: _property_size(prop) * tari_rate,
+            description=lambda prop, cv: f"~€{tari_rate}/sqm/year estimate for {_property_size(prop):.0f}sqm",
+            is_estimate=True,
+        ),
+        PlanStep(
+            name="Condominium Fees",
+            amount=lambda prop, cv: prop.monthly_condo_fee * 12,
+            description=lambda prop, cv: f"€{prop.monthly_condo_fee:.0f}/month × 12",
+            when=lambda prop: prop.is_apartment and bool(prop.monthly_condo_fee),
+        ),
+        PlanStep(
+            name="Condominium Fees",
+            amount=lambda prop, cv: (100 + _property_size(prop) * 0.5) * 12,
+            description=lambda prop, cv: f"Estimated ~€{100 + _property_size(prop) * 0.5:.0f}/month",
+            is_estimate=True,
+            when=lambda prop: prop.is_apartment and not prop.monthly_condo_fee,
+            note="Condominium fees vary widely by building and services. Verify with seller.",
+        ),
+        PlanStep(
+            name="Utilities (Estimate)",
+            amount=lambda prop, cv: _property_size(prop) * UTILITY_ESTIMATES["total_per_sqm"],
+            description=lambda prop, cv: f"Electricity, gas, water for {_property_size(prop):.0f}sqm",
+            is_estimate=True,
+        ),
+    ])
+    return steps
+
+
+def compile_plans() -> dict[tuple[str, bool, bool], CalculationPlan]:
+    """Compile one plan per (seller_type, prima_casa, luxury) combination."""
+    plans = {}
+    for seller_type, prima_casa, luxury in product(("private", "developer"), (False, True), (False, True)):
+        plans[(seller_type, prima_casa, luxury)] = CalculationPlan(
+            seller_type=seller_type,
+            prima_casa=prima_casa,
+            luxury=luxury,
+            one_time=tuple(_tax_steps(seller_type, prima_casa, luxury) + _fee_steps(prima_casa)),
+            annual=tuple(_annual_steps(prima_casa, luxury)),
+        )
+    return plans
+
+
+PLANS = compile_plans()
+
+
+def get_plan(prop: PropertyInput) -> CalculationPlan:
+    """Look up the precompiled plan for an input's scenario."""
+    luxury = bool(prop.cadastral_category) and prop.cadastral_category.upper() in LUXURY_CATEGORIES
+    return PLANS[(prop.seller_type.value, prop.prima_casa, luxury)]
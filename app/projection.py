@@ -0,0 +1,126 @@
+"""
+Multi-year total cost of ownership projections.
+
+Builds on the annual costs from the batch engine and projects them over a
+horizon of years with per-item escalation, the outstanding mortgage balance
+and an exchange-rate path. Every figure is computed as a (properties, years)
+array in one pass, with no Python loop per property or per year.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from app.data.rates import COST_ESCALATION, MORTGAGE_DEFAULTS
+from app.engine import BatchCosts, ANNUAL_ITEM_KEYS
+from app.mortgage import mortgage_balances
+
+
+@dataclass(frozen=True)
+class ProjectionAssumptions:
+    """
+    Assumptions for an ownership projection.
+
+    escalation overrides COST_ESCALATION per annual item key. fx_path, when
+    given, holds one multiplier per year applied to today's exchange rate;
+    otherwise the rate compounds by fx_drift per year.
+    """
+    years: int = 10
+    escalation: dict[str, float] = field(default_factory=dict)
+    mortgage_rate: float = MORTGAGE_DEFAULTS["annual_rate"]
+    mortgage_term_years: int = MORTGAGE_DEFAULTS["term_years"]
+    fx_drift: float = 0.0
+    fx_path: Optional[tuple[float, ...]] = None
+
+    def __post_init__(self):
+        if self.years < 1:
+            raise ValueError("Projection needs at least one year")
+        unknown = set(self.escalation) - set(ANNUAL_ITEM_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown cost items: {', '.join(sorted(unknown))}")
+        if self.fx_path is not None and len(self.fx_path) != self.years:
+            raise ValueError("fx_path must have one value per projected year")
+
+    def escalation_rates(self) -> np.ndarray:
+        """Escalation rate per annual item, in ANNUAL_ITEM_KEYS order."""
+        return np.array([
+            self.escalation.get(key, COST_ESCALATION[key]) for key in ANNUAL_ITEM_KEYS
+        ])
+
+    def fx_multipliers(self) -> np.ndarray:
+        """Exchange-rate multiplier per year relative to today."""
+        if self.fx_path is not None:
+            return np.array(self.fx_path, dtype=float)
+        return (1 + self.fx_drift) ** np.arange(self.years)
+
+
+@dataclass(frozen=True)
+class OwnershipProjection:
+    """
+    Year-indexed projection for a batch of properties, in EUR.
+
+    Per-year arrays have shape (n_properties, years); annual_items has shape
+    (n_properties, years, n_annual_items). Year 1 is the year of purchase.
+    """
+    years: np.ndarray
+    annual_items: np.ndarray
+    mortgage_payment: np.ndarray
+    mortgage_interest: np.ndarray
+    mortgage_balance: np.ndarray
+    cumulative_cost: np.ndarray
+    fx_rate: np.ndarray
+
+    @property
+    def annual_total(self) -> np.ndarray:
+        return self.annual_items.sum(axis=2)
+
+
+def project_ownership(
+    costs: BatchCosts,
+    principal: np.ndarray,
+    exchange_rates: np.ndarray,
+    assumptions: ProjectionAssumptions
+) -> OwnershipProjection:
+    """
+    Project ownership costs over assumptions.years for every property.
+
+    principal is the loan amount per property (0 without a mortgage) and
+    exchange_rates today's EUR -> source currency rate per property (NaN for
+    EUR rows, which stay NaN in fx_rate).
+    """
+    years = np.arange(1, assumptions.years + 1)
+
+    # Annual items escalate independently: (n, 1, items) * (1, years, items)
+    growth = (1 + assumptions.escalation_rates()) ** (years - 1)[:, None]
+    annual_items = costs.annual[:, None, :] * growth[None, :, :]
+
+    # Mortgage balance at the start and end of each year
+    payment, balance_end = mortgage_balances(
+        principal, assumptions.mortgage_rate, assumptions.mortgage_term_years, years * 12
+    )
+    _, balance_start = mortgage_balances(
+        principal, assumptions.mortgage_rate, assumptions.mortgage_term_years, (years - 1) * 12
+    )
+    n_months = assumptions.mortgage_term_years * 12
+    months_paid = np.minimum(years * 12, n_months) - np.minimum((years - 1) * 12, n_months)
+    mortgage_payment = payment[:, None] * months_paid[None, :]
+    mortgage_interest = mortgage_payment - (balance_start - balance_end)
+
+    cumulative_cost = (
+        (costs.purchase_price + costs.total_one_time)[:, None]
+        + np.cumsum(annual_items.sum(axis=2), axis=1)
+        + np.cumsum(mortgage_interest, axis=1)
+    )
+
+    fx_rate = exchange_rates[:, None] * assumptions.fx_multipliers()[None, :]
+
+    return OwnershipProjection(
+        years=years,
+        annual_items=annual_items,
+        mortgage_payment=mortgage_payment,
+        mortgage_interest=mortgage_interest,
+        mortgage_balance=balance_end,
+        cumulative_cost=cumulative_cost,
+        fx_rate=fx_rate,
+    )
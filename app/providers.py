@@ -0,0 +1,330 @@
+"""
+Exchange rate providers.
+
+A provider returns the latest base -> currency rates. Besides Frankfurter
+there is a static-file provider and an in-process fake Frankfurter server,
+so the rate path can be tested and load-tested without network access.
+HedgedProvider sends a second request to a backup provider when the
+primary is slower than usual and takes whichever answers first.
+
+Every provider records a latency histogram for /api/stats.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from app.clients import clients
+
+
+# Frankfurter base URL; point at a local stand-in server for testing
+FRANKFURTER_URL = os.environ.get("FRANKFURTER_URL", "https://api.frankfurter.app").rstrip("/")
+
+
+class ProviderError(httpx.HTTPError):
+    """A provider could not return rates for reasons other than HTTP."""
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float("inf"))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKETS_MS)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+
+    def record(self, latency_ms: float, ok: bool = True) -> None:
+        self.counts[bisect_left(self.BUCKETS_MS, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        if not ok:
+            self.errors += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile, or None if empty."""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, n in zip(self.BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.BUCKETS_MS[-1]
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets_ms": {
+                ("+Inf" if bound == float("inf") else str(bound)): n
+                for bound, n in zip(self.BUCKETS_MS, self.counts)
+            },
+        }
+
+
+class RateProvider(ABC):
+    """
+    Source of the latest exchange rates.
+
+    fetch() returns base -> currency rates including the base itself and
+    raises httpx.HTTPError (or ProviderError) on failure.
+    """
+
+    name = "provider"
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+
+    async def fetch(self, base: str) -> dict[str, float]:
+        started = time.perf_counter()
+        try:
+            rates = await self._fetch(base)
+        except asyncio.CancelledError:
+            # A cancelled (e.g. out-hedged) call says nothing about latency
+            raise
+        except Exception:
+            self.latency.record((time.perf_counter() - started) * 1000, ok=False)
+            raise
+        self.latency.record((time.perf_counter() - started) * 1000)
+        return rates
+
+    @abstractmethod
+    async def _fetch(self, base: str) -> dict[str, float]:
+        ...
+
+    def stats(self) -> dict:
+        return {self.name: self.latency.stats()}
+
+
+class FrankfurterProvider(RateProvider):
+    """Rates from the Frankfurter API through the shared pooled client."""
+
+    name = "frankfurter"
+
+    def __init__(self, base_url: str = FRANKFURTER_URL, client: Optional[httpx.AsyncClient] = None):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self._client = client
+
+    async def _fetch(self, base: str) -> dict[str, float]:
+        client = self._client or clients.get("frankfurter")
+        # One request returns every currency the provider offers
+        response = await client.get(f"{self.base_url}/latest?from={base}")
+        response.raise_for_status()
+        try:
+            rates = {code: float(rate) for code, rate in response.json()["rates"].items()}
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ProviderError(f"Malformed rates from {self.base_url}: {e!r}") from e
+        # Add the base currency with rate 1.0
+        rates[base] = 1.0
+        return rates
+
+
+class StaticFileProvider(RateProvider):
+    """
+    Rates read from a JSON file in Frankfurter's /latest format.
+
+    The file may use any base; other bases are derived from it.
+    """
+
+    name = "static"
+
+    def __init__(self, path: Path):
+        super().__init__()
+        self.path = Path(path)
+
+    async def _fetch(self, base: str) -> dict[str, float]:
+        try:
+            data = json.loads(self.path.read_text())
+            file_base = data.get("base", "EUR")
+            rates = {code: float(rate) for code, rate in data["rates"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ProviderError(f"Cannot read rates from {self.path}: {e}") from e
+
+        rates[file_base] = 1.0
+        if base not in rates:
+            raise ProviderError(f"No {base} rate in {self.path}")
+        base_to_file = 1 / rates[base]
+        return {code: rate * base_to_file for code, rate in rates.items()}
+
+
+# Approximate EUR rates for the currencies Frankfurter publishes
+_FAKE_EUR_RATES = {
+    "AUD": 1.65, "BGN": 1.96, "BRL": 6.2, "CAD": 1.47, "CHF": 0.94, "CNY": 7.8,
+    "CZK": 25.0, "DKK": 7.46, "GBP": 0.85, "HKD": 8.4, "HUF": 400.0, "IDR": 17500.0,
+    "ILS": 3.9, "INR": 92.0, "ISK": 150.0, "JPY": 165.0, "KRW": 1500.0, "MXN": 20.0,
+    "MYR": 4.9, "NOK": 11.6, "NZD": 1.85, "PHP": 62.0, "PLN": 4.25, "RON": 5.0,
+    "SEK": 11.2, "SGD": 1.45, "THB": 37.0, "TRY": 42.0, "USD": 1.08, "ZAR": 20.0,
+}
+
+
+class FakeFrankfurter(httpx.AsyncBaseTransport):
+    """
+    In-process stand-in for the Frankfurter /latest endpoint.
+
+    Use as the transport of an httpx.AsyncClient passed to
+    FrankfurterProvider. Latency is drawn uniformly from latency_ms and a
+    failure_rate share of requests get a 503.
+    """
+
+    def __init__(
+        self,
+        rates: Optional[dict[str, float]] = None,
+        latency_ms: tuple[float, float] = (0.0, 0.0),
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.rates = rates or dict(_FAKE_EUR_RATES)
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(self._random.uniform(*self.latency_ms) / 1000)
+        if self._random.random() < self.failure_rate:
+            return httpx.Response(503, request=request)
+
+        base = request.url.params.get("from", "EUR")
+        eur_rates = {"EUR": 1.0, **self.rates}
+        if base not in eur_rates:
+            return httpx.Response(404, json={"message": "not found"}, request=request)
+        wanted = request.url.params.get("to")
+        codes = wanted.split(",") if wanted else [c for c in eur_rates if c != base]
+        rates = {c: eur_rates[c] / eur_rates[base] for c in codes if c in eur_rates and c != base}
+        return httpx.Response(
+            200,
+            json={"amount": 1.0, "base": base, "date": time.strftime("%Y-%m-%d"), "rates": rates},
+            request=request,
+        )
+
+
+def fake_frankfurter_provider(**options) -> FrankfurterProvider:
+    """A FrankfurterProvider wired to a FakeFrankfurter transport."""
+    transport = FakeFrankfurter(**options)
+    provider = FrankfurterProvider(client=httpx.AsyncClient(transport=transport))
+    provider.name = "fake"
+    return provider
+
+
+class HedgedProvider(RateProvider):
+    """
+    Primary provider with a hedged backup request.
+
+    If the primary has not answered within its own hedge_percentile latency
+    (or initial_delay_ms until min_samples requests have been seen), the
+    backup is called too and the first successful answer wins. A failure
+    from one side waits for the other.
+    """
+
+    def __init__(
+        self,
+        primary: RateProvider,
+        backup: RateProvider,
+        hedge_percentile: float = 95.0,
+        min_samples: int = 20,
+        initial_delay_ms: float = 1000.0
+    ):
+        super().__init__()
+        self.primary = primary
+        self.backup = backup
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.initial_delay_ms = initial_delay_ms
+        self.name = f"hedged({primary.name},{backup.name})"
+        self.hedges = 0
+        self.backup_wins = 0
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before hedging."""
+        delay_ms = self.initial_delay_ms
+        if self.primary.latency.count >= self.min_samples:
+            delay_ms = self.primary.latency.percentile(self.hedge_percentile)
+            if delay_ms == float("inf"):
+                delay_ms = self.initial_delay_ms
+        return delay_ms / 1000
+
+    async def _fetch(self, base: str) -> dict[str, float]:
+        primary = asyncio.ensure_future(self.primary.fetch(base))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay())
+            if done and primary.exception() is None:
+                return primary.result()
+
+            # The primary is slow or already failed
+            self.hedges += 1
+            backup = asyncio.ensure_future(self.backup.fetch(base))
+            tasks.append(backup)
+            error = primary.exception() if primary.done() else None
+            pending = {task for task in tasks if not task.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.backup_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            **self.primary.stats(),
+            **self.backup.stats(),
+            self.name: {
+                **self.latency.stats(),
+                "hedges": self.hedges,
+                "backup_wins": self.backup_wins,
+                "hedge_delay_ms": self.hedge_delay() * 1000,
+            },
+        }
+
+
+def provider_from_spec(spec: str) -> RateProvider:
+    """
+    Build a provider from a setting value.
+
+    "frankfurter", "fake" or "static:<path>".
+    """
+    if spec == "frankfurter":
+        return FrankfurterProvider()
+    if spec == "fake":
+        return fake_frankfurter_provider()
+    if spec.startswith("static:"):
+        return StaticFileProvider(Path(spec.removeprefix("static:")))
+    raise ValueError(f"Unknown rate provider: {spec}")
+
+
+def provider_from_env() -> RateProvider:
+    """RATE_PROVIDER, hedged with RATE_HEDGE_PROVIDER when that is set."""
+    primary = provider_from_spec(os.environ.get("RATE_PROVIDER", "frankfurter"))
+    backup = os.environ.get("RATE_HEDGE_PROVIDER")
+    if not backup:
+        return primary
+    return HedgedProvider(
+        primary,
+        provider_from_spec(backup),
+        hedge_percentile=float(os.environ.get("RATE_HEDGE_PERCENTILE", 95)),
+    )
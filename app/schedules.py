@@ -0,0 +1,85 @@
+"""
+Compiled tiered fee schedules.
+
+Tiered fees in app/data/rates.py are stored as tuple tables of
+(upper_bound, base_fee, rate_on_excess). BracketSchedule compiles such a
+table once into sorted bound arrays so lookups are a binary search for a
+single amount and a searchsorted for a whole array.
+"""
+
+from bisect import bisect_left
+from typing import Sequence
+
+import numpy as np
+
+from app.data.rates import NOTARY_FEE_SCHEDULE
+
+
+class BracketSchedule:
+    """
+    Piecewise-linear fee schedule.
+
+    An amount falls in the first bracket whose upper bound it does not
+    exceed, and is charged that bracket's base fee plus its rate on the part
+    above the previous bracket's upper bound. Amounts above the last upper
+    bound are charged at the last bracket.
+    """
+
+    __slots__ = ("lower_bounds", "upper_bounds", "bases", "rates", "_arrays")
+
+    def __init__(self, table: Sequence[tuple[float, float, float]]):
+        if not table:
+            raise ValueError("Schedule table must have at least one bracket")
+
+        upper = [float(row[0]) for row in table]
+        if any(b <= a for a, b in zip(upper, upper[1:])):
+            raise ValueError("Schedule upper bounds must be strictly increasing")
+
+        self.upper_bounds = tuple(upper)
+        self.lower_bounds = (0.0,) + self.upper_bounds[:-1]
+        self.bases = tuple(float(row[1]) for row in table)
+        self.rates = tuple(float(row[2]) for row in table)
+        self._arrays = tuple(
+            np.array(values)
+            for values in (self.lower_bounds, self.upper_bounds, self.bases, self.rates)
+        )
+
+    @classmethod
+    def progressive(cls, table: Sequence[tuple[float, float]]) -> "BracketSchedule":
+        """
+        Build a marginal-rate schedule from (upper_bound, rate) rows.
+
+        Each bracket's base is the cumulative fee charged by all brackets
+        below it, so the resulting fee is continuous.
+        """
+        rows = []
+        lower = 0.0
+        base = 0.0
+        for upper, rate in table:
+            rows.append((upper, base, rate))
+            if upper != float("inf"):
+                base += (upper - lower) * rate
+            lower = upper
+        return cls(rows)
+
+    def __len__(self) -> int:
+        return len(self.upper_bounds)
+
+    def bracket(self, amount: float) -> int:
+        """Index of the bracket an amount falls in."""
+        return min(bisect_left(self.upper_bounds, amount), len(self.upper_bounds) - 1)
+
+    def __call__(self, amount: float) -> float:
+        """Fee for a single amount."""
+        i = self.bracket(amount)
+        return self.bases[i] + (amount - self.lower_bounds[i]) * self.rates[i]
+
+    def evaluate(self, amounts: np.ndarray) -> np.ndarray:
+        """Fees for a whole array of amounts."""
+        lower, upper, bases, rates = self._arrays
+        idx = np.minimum(np.searchsorted(upper, amounts, side="left"), len(upper) - 1)
+        return bases[idx] + (amounts - lower[idx]) * rates[idx]
+
+
+# Compiled schedules for the tiered tables in app/data/rates.py
+NOTARY_FEES = BracketSchedule(NOTARY_FEE_SCHEDULE)
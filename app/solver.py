@@ -0,0 +1,84 @@
+"""
+Inverse solver: the largest purchase price that fits an all-in budget.
+
+For fixed purchase options, purchase_price + total one-time costs is
+piecewise linear in the price. The pieces are delimited by the notary
+brackets and, for prima casa purchases with an estimated cadastral value,
+the point where the registration tax minimum stops binding. Each piece is
+solved in closed form, so no iteration is needed, and many budgets are
+solved at once as array operations.
+"""
+
+from dataclasses import replace
+
+import numpy as np
+
+from app.models import PropertyInput, PurchaseOptions
+from app.data.rates import REGISTRATION_TAX
+from app.engine import PropertyColumns, calculate_columns, cadastral_values
+from app.schedules import NOTARY_FEES
+
+
+def _columns(options: PurchaseOptions, prices: np.ndarray) -> PropertyColumns:
+    """Columns for the given options at each price."""
+    template = PropertyInput(purchase_price=1.0, **options.model_dump())
+    return replace(
+        PropertyColumns.from_inputs([template]).broadcast(len(prices)),
+        purchase_price=prices,
+    )
+
+
+def all_in_cost(options: PurchaseOptions, prices: np.ndarray) -> np.ndarray:
+    """purchase_price + total one-time costs at each price."""
+    return prices + calculate_columns(_columns(options, prices)).total_one_time
+
+
+def price_breakpoints(options: PurchaseOptions) -> np.ndarray:
+    """Prices where the all-in cost changes slope or jumps, in ascending order."""
+    points = [b for b in NOTARY_FEES.upper_bounds if np.isfinite(b)]
+
+    # The prima casa registration minimum binds below a price threshold
+    # when the cadastral value is estimated from the price
+    if options.prima_casa and options.seller_type.value == "private" and not options.cadastral_income:
+        cv_per_euro = cadastral_values(_columns(options, np.array([1.0])))[0]
+        points.append(
+            REGISTRATION_TAX["prima_casa_minimum"] / (REGISTRATION_TAX["prima_casa_private"] * cv_per_euro)
+        )
+
+    return np.unique(points)
+
+
+def solve_max_price(options: PurchaseOptions, budgets: np.ndarray) -> np.ndarray:
+    """
+    Largest price whose all-in cost fits each budget (NaN where none does).
+
+    Within each segment (lo, hi] the all-in cost is a + b * price, so the
+    best price in the segment is min(hi, (budget - a) / b) when that exceeds
+    lo. The answer is the best over all segments, which also handles the
+    downward jumps at notary bracket boundaries.
+    """
+    budgets = np.asarray(budgets, dtype=float)
+    bounds = price_breakpoints(options)
+    lo = np.concatenate(([0.0], bounds))
+    hi = np.concatenate((bounds, [np.inf]))
+
+    # Two interior points per segment give its slope and intercept exactly
+    width = np.where(np.isfinite(hi), hi - lo, lo)
+    x1 = lo + width / 3
+    x2 = lo + width * 2 / 3
+    y = all_in_cost(options, np.concatenate((x1, x2)))
+    y1, y2 = y[:len(lo)], y[len(lo):]
+    slope = (y2 - y1) / (x2 - x1)
+    intercept = y1 - slope * x1
+
+    # (budgets, segments) candidate prices
+    solution = (budgets[:, None] - intercept[None, :]) / slope[None, :]
+    candidate = np.minimum(solution, hi[None, :])
+    candidate = np.where(solution > lo[None, :], candidate, np.nan)
+
+    best = np.full(len(budgets), np.nan)
+    feasible = ~np.all(np.isnan(candidate), axis=1)
+    best[feasible] = np.nanmax(candidate[feasible], axis=1)
+
+    # Round down to the cent so the price never exceeds the budget
+    return np.floor(best * 100) / 100
@@ -0,0 +1,197 @@
+"""
+Monte Carlo uncertainty for cost estimates.
+
+app/data/rates.py stores min/max ranges next to the defaults for
+professional fees, bank fees, TARI and IMU. This module samples those
+ranges (triangular, peaking at the default) for many draws per property
+and reports percentiles per line item and for the totals. Only the
+uncertain columns are sampled; everything else is taken from the
+deterministic batch engine.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from app.models import PropertyInput
+from app.data.rates import PROFESSIONAL_FEES, MORTGAGE_FEES, IMU_RATES, TARI_RATES
+from app.engine import (
+    PropertyColumns, BatchCosts, calculate_columns, ONE_TIME_ITEMS, ANNUAL_ITEMS,
+)
+
+
+PERCENTILES = (10, 50, 90)
+
+
+@dataclass(frozen=True)
+class UncertainInput:
+    """
+    A sampled line item.
+
+    Draws come from a triangular distribution over (low, mode, high) and are
+    multiplied by scale(cols, costs). Rows where applies(cols) is false keep
+    their deterministic amount.
+    """
+    column: int
+    low: float
+    mode: float
+    high: float
+    applies: Callable[[PropertyColumns], np.ndarray]
+    scale: Callable[[PropertyColumns, BatchCosts], np.ndarray] = (
+        lambda cols, costs: np.ones(len(cols))
+    )
+
+
+def _always(cols: PropertyColumns) -> np.ndarray:
+    return np.ones(len(cols), dtype=bool)
+
+
+def _second_home(cols: PropertyColumns) -> np.ndarray:
+    # Prima casa IMU is either exempt or a fixed luxury rate, so only second homes vary
+    return ~cols.prima_casa
+
+
+def _property_size(cols: PropertyColumns, costs: BatchCosts) -> np.ndarray:
+    return np.where(cols.property_size_sqm > 0, cols.property_size_sqm, 100.0)
+
+
+def _cadastral_value(cols: PropertyColumns, costs: BatchCosts) -> np.ndarray:
+    return costs.cadastral_value
+
+
+ONE_TIME_INPUTS = (
+    UncertainInput(
+        ONE_TIME_ITEMS.index("Geometra (Surveyor)"),
+        PROFESSIONAL_FEES["geometra_min"],
+        PROFESSIONAL_FEES["geometra_default"],
+        PROFESSIONAL_FEES["geometra_max"],
+        lambda cols: cols.include_geometra,
+    ),
+    UncertainInput(
+        ONE_TIME_ITEMS.index("Technical Reports"),
+        PROFESSIONAL_FEES["technical_reports_min"],
+        PROFESSIONAL_FEES["technical_reports_default"],
+        PROFESSIONAL_FEES["technical_reports_max"],
+        _always,
+    ),
+    UncertainInput(
+        ONE_TIME_ITEMS.index("Translator"),
+        PROFESSIONAL_FEES["translator_min"],
+        PROFESSIONAL_FEES["translator_default"],
+        PROFESSIONAL_FEES["translator_max"],
+        lambda cols: cols.include_translator,
+    ),
+    UncertainInput(
+        ONE_TIME_ITEMS.index("Bank Fees"),
+        MORTGAGE_FEES["bank_fee_min"],
+        MORTGAGE_FEES["bank_fee_default"],
+        MORTGAGE_FEES["bank_fee_max"],
+        lambda cols: cols.using_mortgage,
+    ),
+    UncertainInput(
+        ONE_TIME_ITEMS.index("Property Valuation"),
+        MORTGAGE_FEES["valuation_fee_min"],
+        MORTGAGE_FEES["valuation_fee_default"],
+        MORTGAGE_FEES["valuation_fee_max"],
+        lambda cols: cols.using_mortgage,
+    ),
+)
+
+ANNUAL_INPUTS = (
+    UncertainInput(
+        ANNUAL_ITEMS.index("IMU (Property Tax)"),
+        IMU_RATES["second_home_min"],
+        IMU_RATES["second_home_default"],
+        IMU_RATES["second_home_max"],
+        _second_home,
+        _cadastral_value,
+    ),
+    UncertainInput(
+        ANNUAL_ITEMS.index("TARI (Waste Tax)"),
+        TARI_RATES["min_per_sqm"],
+        TARI_RATES["default_per_sqm"],
+        TARI_RATES["max_per_sqm"],
+        _always,
+        _property_size,
+    ),
+)
+
+
+@dataclass(frozen=True)
+class UncertaintyResult:
+    """
+    Percentiles (PERCENTILES order) per property.
+
+    one_time and annual have shape (n, len(PERCENTILES), n_items); totals
+    have shape (n, len(PERCENTILES)).
+    """
+    one_time: np.ndarray
+    annual: np.ndarray
+    total_one_time: np.ndarray
+    total_annual: np.ndarray
+    grand_total_first_year: np.ndarray
+
+
+def _simulate_section(
+    deterministic: np.ndarray,
+    inputs: tuple[UncertainInput, ...],
+    cols: PropertyColumns,
+    costs: BatchCosts,
+    draws: int,
+    rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Item percentiles and per-draw section totals for one cost section.
+
+    Returns (item_percentiles (n, P, items), totals (n, draws)).
+    """
+    n = len(cols)
+    q = np.array(PERCENTILES)
+
+    # Unsampled items are constant across draws
+    item_pct = np.repeat(deterministic[:, None, :], len(q), axis=1)
+    sampled_columns = [u.column for u in inputs]
+    fixed_total = np.delete(deterministic, sampled_columns, axis=1).sum(axis=1)
+    totals = np.repeat(fixed_total[:, None], draws, axis=1)
+
+    for u in inputs:
+        samples = rng.triangular(u.low, u.mode, u.high, size=(n, draws))
+        samples *= u.scale(cols, costs)[:, None]
+        samples = np.where(u.applies(cols)[:, None], samples, deterministic[:, u.column, None])
+        item_pct[:, :, u.column] = np.percentile(samples, q, axis=1).T
+        totals += samples
+
+    return item_pct, totals
+
+
+def simulate_columns(
+    cols: PropertyColumns,
+    draws: int = 20_000,
+    seed: Optional[int] = None
+) -> UncertaintyResult:
+    """Run the simulation over already-columnized inputs."""
+    rng = np.random.default_rng(seed)
+    costs = calculate_columns(cols)
+    q = np.array(PERCENTILES)
+
+    one_time, one_time_totals = _simulate_section(costs.one_time, ONE_TIME_INPUTS, cols, costs, draws, rng)
+    annual, annual_totals = _simulate_section(costs.annual, ANNUAL_INPUTS, cols, costs, draws, rng)
+    grand_totals = costs.purchase_price[:, None] + one_time_totals + annual_totals
+
+    return UncertaintyResult(
+        one_time=one_time,
+        annual=annual,
+        total_one_time=np.percentile(one_time_totals, q, axis=1).T,
+        total_annual=np.percentile(annual_totals, q, axis=1).T,
+        grand_total_first_year=np.percentile(grand_totals, q, axis=1).T,
+    )
+
+
+def simulate_batch(
+    props: Sequence[PropertyInput],
+    draws: int = 20_000,
+    seed: Optional[int] = None
+) -> UncertaintyResult:
+    """Sample the rate-table ranges for every property in a batch."""
+    return simulate_columns(PropertyColumns.from_inputs(props), draws, seed)
@@ -18,6 +18,10 @@ document.addEventListener('DOMContentLoaded', function() {
     const mortgageAmountGroup = document.querySelector('.mortgage-amount-group');
     const includeAgencyCheckbox = document.getElementById('include_agency_fee');
     const agencyRateGroup = document.querySelector('.agency-rate-group');
+    const sourceCurrencySelect = document.getElementById('source_currency');
+
+    // Last calculation in every currency, keyed by the rest of the form
+    let lastCalculation = null;
 
     // Toggle condo fee input
     isApartmentCheckbox.addEventListener('change', function() {
@@ -34,6 +38,19 @@ document.addEventListener('DOMContentLoaded', function() {
         agencyRateGroup.style.display = this.checked ? 'block' : 'none';
     });
 
+    // Switch display currency locally when the rest of the form is unchanged
+    sourceCurrencySelect.addEventListener('change', function() {
+        if (!lastCalculation) return;
+        const formData = collectFormData();
+        if (calculationKey(formData) !== lastCalculation.key) return;
+        const result = lastCalculation.results[formData.source_currency];
+        if (result) {
+            displayResults(result);
+        } else {
+            calculateCosts();
+        }
+    });
+
     // Form submission
     form.addEventListener('submit', async function(e) {
         e.preventDefault();
@@ -44,6 +61,7 @@ document.addEventListener('DOMContentLoaded', function() {
     form.addEventListener('reset', function() {
         resultsSection.style.display = 'none';
         condoFeeRow.style.display = 'none';
+        lastCalculation = null;
         mortgageAmountGroup.style.display = 'none';
     });
 
@@ -55,11 +73,22 @@ document.addEventListener('DOMContentLoaded', function() {
             const response = await fetch('/api/rates');
             const data = await response.json();
 
-            const rateStrings = Object.entries(data.rates)
-                .filter(([curr]) => curr !== 'EUR')
-                .map(([curr, rate]) => `1 EUR = ${rate.toFixed(4)} ${curr}`)
+            // Headline rates for the currencies listed in the page
+            const listed = Array.from(sourceCurrencySelect.options, (option) => option.value);
+            const rateStrings = listed
+                .filter((curr) => curr !== 'EUR' && data.rates[curr])
+                .map((curr) => `1 EUR = ${data.rates[curr].toFixed(4)} ${curr}`)
                 .join(' | ');
 
+            // Offer every other currency the rate provider supports
+            const names = new Intl.DisplayNames(['en'], { type: 'currency' });
+            Object.keys(data.rates)
+                .filter((curr) => !listed.includes(curr))
+                .sort()
+                .forEach((curr) => {
+                    sourceCurrencySelect.add(new Option(`${curr} (${names.of(curr)})`, curr));
+                });
+
             rateDisplay.textContent = `Exchange rates (${data.date}): ${rateStrings}`;
         } catch (error) {
             console.error('Failed to load exchange rates:', error);
@@ -78,7 +107,7 @@ document.addEventListener('DOMContentLoaded', function() {
         resultsContent.innerHTML = '<div class="loading"></div>';
 
         try {
-            const response = await fetch('/api/calculate', {
+            const response = await fetch('/api/calculate/currencies', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -91,8 +120,9 @@ document.addEventListener('DOMContentLoaded', function() {
                 throw new Error(error.detail || 'Calculation failed');
             }
 
-            const result = await response.json();
-            displayResults(result);
+            const data = await response.json();
+            lastCalculation = { key: calculationKey(formData), results: data.results };
+            displayResults(data.results[formData.source_currency]);
 
             // Scroll to results
             resultsSection.scrollIntoView({ behavior: 'smooth' });
@@ -141,6 +171,14 @@ document.addEventListener('DOMContentLoaded', function() {
         return data;
     }
 
+    /**
+     * Key identifying a calculation regardless of display currency
+     */
+    function calculationKey(formData) {
+        const { source_currency, ...rest } = formData;
+        return JSON.stringify(rest);
+    }
+
     /**
      * Display calculation results
      */
@@ -7,9 +7,19 @@
 let categories = [];
 let regions = [];
 let professionals = [];
+let nextCursor = null;
+
+// Cards are loaded a page at a time, with only the fields they show
+const PAGE_SIZE = 24;
+const CARD_FIELDS = [
+    'category', 'name', 'contact_person', 'regions', 'languages',
+    'description', 'highlights', 'verified', 'featured', 'website',
+].join(',');
 let currentFilters = {
+    q: '',
     category: '',
     region: '',
+    language: '',
     verified: false,
     featured: false,
 };
@@ -22,11 +32,15 @@ const noResults = document.getElementById('no-results');
 const resultsCount = document.getElementById('results-count');
 const clearFiltersBtn = document.getElementById('clear-filters');
 const clearFiltersLink = document.getElementById('clear-filters-link');
+const loadMoreBtn = document.getElementById('load-more');
 const categoryInfo = document.getElementById('category-info');
 
 // Filter elements
+const filterSearch = document.getElementById('filter-search');
+const searchSuggestions = document.getElementById('search-suggestions');
 const filterCategory = document.getElementById('filter-category');
 const filterRegion = document.getElementById('filter-region');
+const filterLanguage = document.getElementById('filter-language');
 const filterVerified = document.getElementById('filter-verified');
 const filterFeatured = document.getElementById('filter-featured');
 
@@ -92,26 +106,39 @@ async function loadRegions() {
     }
 }
 
-// Load professionals from API
+// Build the search query for the current filters
+function searchParams() {
+    const params = new URLSearchParams();
+    if (currentFilters.q) params.append('q', currentFilters.q);
+    if (currentFilters.category) params.append('category', currentFilters.category);
+    if (currentFilters.region) params.append('region', currentFilters.region);
+    if (currentFilters.language) params.append('language', currentFilters.language);
+    if (currentFilters.verified) params.append('verified', 'true');
+    if (currentFilters.featured) params.append('featured', 'true');
+    params.append('limit', PAGE_SIZE);
+    params.append('fields', CARD_FIELDS);
+    return params;
+}
+
+// Load the first page of professionals from API
 async function loadProfessionals() {
     loadingIndicator.style.display = 'block';
     professionalsGrid.innerHTML = '';
     noResults.style.display = 'none';
+    loadMoreBtn.style.display = 'none';
 
     try {
-        const params = new URLSearchParams();
-        if (currentFilters.category) params.append('category', currentFilters.category);
-        if (currentFilters.region) params.append('region', currentFilters.region);
-        if (currentFilters.verified) params.append('verified', 'true');
-        if (currentFilters.featured) params.append('featured', 'true');
-
+        const params = searchParams();
+        params.append('facets', 'true');
         const response = await fetch(`/api/professionals?${params.toString()}`);
         if (!response.ok) throw new Error('Failed to load professionals');
 
         const data = await response.json();
         professionals = data.professionals;
+        nextCursor = data.next_cursor || null;
 
         renderProfessionals();
+        updateFacetCounts(data.facets);
         updateResultsCount(data.total);
         updateCategoryInfo();
 
@@ -123,6 +150,28 @@ async function loadProfessionals() {
     }
 }
 
+// Append the next page of professionals
+async function loadMoreProfessionals() {
+    if (!nextCursor) return;
+    loadMoreBtn.disabled = true;
+
+    try {
+        const params = searchParams();
+        params.append('cursor', nextCursor);
+        const response = await fetch(`/api/professionals?${params.toString()}`);
+        if (!response.ok) throw new Error('Failed to load professionals');
+
+        const data = await response.json();
+        professionals = professionals.concat(data.professionals);
+        nextCursor = data.next_cursor || null;
+        renderProfessionals();
+    } catch (error) {
+        console.error('Error loading more professionals:', error);
+    } finally {
+        loadMoreBtn.disabled = false;
+    }
+}
+
 // Render category quick links
 function renderCategoryLinks() {
     categoryLinksEl.innerHTML = categories.map(cat => `
@@ -173,8 +222,41 @@ function populateRegionFilter() {
         regions.map(r => `<option value="${r}">${REGION_NAMES[r] || r}</option>`).join('');
 }
 
+// Show how many professionals each filter choice would return
+function updateFacetCounts(facets) {
+    if (!facets) return;
+
+    filterCategory.querySelectorAll('option[value]:not([value=""])').forEach(option => {
+        const category = categories.find(c => c.id === option.value);
+        const name = category ? category.plural_en : option.value;
+        option.textContent = `${name} (${facets.category[option.value] || 0})`;
+    });
+
+    filterRegion.querySelectorAll('option[value]:not([value=""])').forEach(option => {
+        const name = REGION_NAMES[option.value] || option.value;
+        option.textContent = `${name} (${facets.region[option.value] || 0})`;
+    });
+
+    // Languages are only known from the facets; list those with matches.
+    // A language from the URL may differ in case, so adopt the facet spelling.
+    const wanted = currentFilters.language.toLowerCase();
+    const canonical = Object.keys(facets.language).find(language => language.toLowerCase() === wanted);
+    if (canonical) currentFilters.language = canonical;
+
+    const languages = Object.entries(facets.language)
+        .filter(([language, count]) => count > 0 || language === currentFilters.language);
+    filterLanguage.innerHTML = '<option value="">All Languages</option>' +
+        languages.map(([language, count]) => `<option value="${language}">${language} (${count})</option>`).join('');
+    filterLanguage.value = currentFilters.language;
+
+    document.getElementById('count-verified').textContent = `(${facets.verified.true})`;
+    document.getElementById('count-featured').textContent = `(${facets.featured.true})`;
+}
+
 // Render professionals
 function renderProfessionals() {
+    loadMoreBtn.style.display = nextCursor ? 'block' : 'none';
+
     if (professionals.length === 0) {
         professionalsGrid.innerHTML = '';
         noResults.style.display = 'block';
@@ -221,7 +303,8 @@ function renderProfessionals() {
 
 // Update results count
 function updateResultsCount(total) {
-    const filterActive = currentFilters.category || currentFilters.region ||
+    const filterActive = currentFilters.q || currentFilters.category || currentFilters.region ||
+                         currentFilters.language ||
                          currentFilters.verified || currentFilters.featured;
 
     resultsCount.textContent = `${total} professional${total !== 1 ? 's' : ''} found`;
@@ -248,8 +331,69 @@ function updateCategoryInfo() {
     categoryInfo.style.display = 'block';
 }
 
+// Autocomplete suggestions, cached per typed prefix
+const suggestionCache = new Map();
+let shownSuggestions = [];
+let suggestTimer = null;
+
+async function loadSuggestions(prefix) {
+    if (!suggestionCache.has(prefix)) {
+        const params = new URLSearchParams({ q: prefix, limit: '8' });
+        const response = await fetch(`/api/professionals/autocomplete?${params.toString()}`);
+        if (!response.ok) return;
+        suggestionCache.set(prefix, (await response.json()).suggestions);
+    }
+    // Ignore answers for text the user has already changed
+    if (filterSearch.value.trim() !== prefix) return;
+
+    shownSuggestions = suggestionCache.get(prefix);
+    searchSuggestions.replaceChildren(...shownSuggestions.map(s => {
+        const option = document.createElement('option');
+        option.value = s.label;
+        option.textContent = s.type;
+        return option;
+    }));
+}
+
+function onSearchInput() {
+    clearTimeout(suggestTimer);
+    const prefix = filterSearch.value.trim();
+    if (prefix.length < 2) {
+        searchSuggestions.innerHTML = '';
+        return;
+    }
+    suggestTimer = setTimeout(() => {
+        loadSuggestions(prefix).catch(error => console.error('Error loading suggestions:', error));
+    }, 150);
+}
+
+// A picked region sets the region filter and a professional opens its page;
+// anything else is searched as text
+function onSearchChange() {
+    const text = filterSearch.value.trim();
+    const picked = shownSuggestions.find(s => s.label === text);
+
+    if (picked && picked.type === 'professional') {
+        window.location.href = `/professionals/${encodeURIComponent(picked.id)}`;
+        return;
+    }
+    if (picked && picked.type === 'region') {
+        currentFilters.region = picked.id;
+        filterRegion.value = picked.id;
+        filterSearch.value = '';
+        currentFilters.q = '';
+    } else {
+        currentFilters.q = text;
+    }
+    updateUrl();
+    loadProfessionals();
+}
+
 // Setup event listeners
 function setupEventListeners() {
+    filterSearch.addEventListener('input', onSearchInput);
+    filterSearch.addEventListener('change', onSearchChange);
+
     filterCategory.addEventListener('change', () => {
         currentFilters.category = filterCategory.value;
         updateUrl();
@@ -263,6 +407,12 @@ function setupEventListeners() {
         loadProfessionals();
     });
 
+    filterLanguage.addEventListener('change', () => {
+        currentFilters.language = filterLanguage.value;
+        updateUrl();
+        loadProfessionals();
+    });
+
     filterVerified.addEventListener('change', () => {
         currentFilters.verified = filterVerified.checked;
         updateUrl();
@@ -275,6 +425,7 @@ function setupEventListeners() {
         loadProfessionals();
     });
 
+    loadMoreBtn.addEventListener('click', loadMoreProfessionals);
     clearFiltersBtn.addEventListener('click', clearAllFilters);
     clearFiltersLink.addEventListener('click', clearAllFilters);
 }
@@ -282,14 +433,18 @@ function setupEventListeners() {
 // Clear all filters
 function clearAllFilters() {
     currentFilters = {
+        q: '',
         category: '',
         region: '',
+        language: '',
         verified: false,
         featured: false,
     };
 
+    filterSearch.value = '';
     filterCategory.value = '';
     filterRegion.value = '';
+    filterLanguage.value = '';
     filterVerified.checked = false;
     filterFeatured.checked = false;
 
@@ -302,6 +457,11 @@ function clearAllFilters() {
 function checkUrlParams() {
     const params = new URLSearchParams(window.location.search);
 
+    if (params.get('q')) {
+        currentFilters.q = params.get('q');
+        filterSearch.value = currentFilters.q;
+    }
+
     if (params.get('category')) {
         currentFilters.category = params.get('category');
         filterCategory.value = currentFilters.category;
@@ -312,6 +472,11 @@ function checkUrlParams() {
         filterRegion.value = currentFilters.region;
     }
 
+    if (params.get('language')) {
+        // The option appears once facets have loaded
+        currentFilters.language = params.get('language');
+    }
+
     if (params.get('verified') === 'true') {
         currentFilters.verified = true;
         filterVerified.checked = true;
@@ -329,8 +494,10 @@ function checkUrlParams() {
 function updateUrl() {
     const params = new URLSearchParams();
 
+    if (currentFilters.q) params.set('q', currentFilters.q);
     if (currentFilters.category) params.set('category', currentFilters.category);
     if (currentFilters.region) params.set('region', currentFilters.region);
+    if (currentFilters.language) params.set('language', currentFilters.language);
     if (currentFilters.verified) params.set('verified', 'true');
     if (currentFilters.featured) params.set('featured', 'true');
 
@@ -0,0 +1,74 @@
+"""
+Shared fixtures.
+"""
+
+import random
+
+import httpx
+import pytest
+
+import app.currency as currency
+from app.cache import TTLCache
+from app.circuit import CircuitBreaker
+from app.providers import FakeFrankfurter, FrankfurterProvider
+
+
+class FakeClock:
+    """A monotonic clock that only moves when told to."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def random_purchase_options(r: random.Random) -> dict:
+    """Purchase options covering the branches of the cost rules."""
+    return dict(
+        source_currency=r.choice(["EUR", "USD", "CAD", "GBP", "AUD"]),
+        property_type=r.choice(["residential", "commercial", "agricultural"]),
+        cadastral_category=r.choice([None, "A/2", "a/1", "A/9"]),
+        cadastral_income=r.choice([None, 0, r.uniform(100, 5000)]),
+        seller_type=r.choice(["private", "developer"]),
+        property_size_sqm=r.choice([None, 0, r.uniform(20, 400)]),
+        prima_casa=r.random() < 0.5,
+        resident_in_italy=r.random() < 0.5,
+        using_mortgage=r.random() < 0.5,
+        mortgage_amount=r.choice([None, 0, r.uniform(1e4, 5e5)]),
+        renovation_budget=r.choice([None, 0, r.uniform(0, 1e5)]),
+        include_agency_fee=r.random() < 0.5,
+        agency_rate=r.choice([None, 0, 0.04]),
+        include_geometra=r.random() < 0.5,
+        include_translator=r.random() < 0.5,
+        is_apartment=r.random() < 0.5,
+        monthly_condo_fee=r.choice([None, 0, 150]),
+    )
+
+
+@pytest.fixture
+def random_options():
+    """random_purchase_options, for tests that draw random inputs."""
+    return random_purchase_options
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch, clock):
+    """A slow FakeFrankfurter behind a fresh, empty rate service."""
+    transport = FakeFrankfurter(latency_ms=(20.0, 20.0))
+    monkeypatch.setattr(currency, "_provider", FrankfurterProvider(client=httpx.AsyncClient(transport=transport)))
+    monkeypatch.setattr(currency, "_snapshots", {})
+    monkeypatch.setattr(currency, "_inflight", {})
+    monkeypatch.setattr(currency, "_fetch_stats", dict.fromkeys(currency._fetch_stats, 0))
+    monkeypatch.setattr(currency, "_breaker", CircuitBreaker(clock=clock))
+    monkeypatch.setattr(currency, "_recent_failures", TTLCache(ttl=currency.NEGATIVE_CACHE_TTL, clock=clock))
+    monkeypatch.setattr(currency, "save_rate_snapshot", lambda: None)
+    return transport
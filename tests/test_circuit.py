@@ -0,0 +1,111 @@
+"""
+Checks of the circuit breaker state machine and the negative cache in
+front of the exchange rate upstream.
+"""
+
+import asyncio
+
+import pytest
+
+import app.currency as currency
+from app.cache import TTLCache
+from app.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=30.0, clock=clock)
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_opens_after_failure_threshold(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.opened == 1
+
+
+def test_success_resets_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_rejects_while_open(breaker, clock):
+    open_breaker(breaker)
+    clock.advance(29.9)
+    assert not breaker.allow()
+    assert not breaker.allow()
+    assert breaker.rejected == 2
+
+
+def test_half_open_lets_one_probe_through(breaker, clock):
+    open_breaker(breaker)
+    clock.advance(30.0)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+
+def test_failed_probe_reopens(breaker, clock):
+    open_breaker(breaker)
+    clock.advance(30.0)
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.opened == 2
+    clock.advance(29.9)
+    assert not breaker.allow()
+    clock.advance(0.1)
+    assert breaker.allow()
+
+
+def test_successful_probe_closes(breaker, clock):
+    open_breaker(breaker)
+    clock.advance(30.0)
+    assert breaker.allow()
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+    assert breaker.allow()
+    assert breaker.allow()
+
+
+def test_negative_cache_entries_expire(clock):
+    cache = TTLCache(ttl=5.0, clock=clock)
+    cache.put("EUR", "503")
+    clock.advance(4.9)
+    assert cache.get("EUR") == "503"
+    clock.advance(0.1)
+    assert cache.get("EUR") is None
+    assert cache.expirations == 1
+
+
+def test_failed_base_is_not_retried_until_negative_cache_expires(fake_upstream, clock):
+    fake_upstream.failure_rate = 1.0
+    assert asyncio.run(currency.get_rate_snapshot("EUR")).source == "fallback"
+    assert fake_upstream.requests == 1
+
+    # Within the TTL callers get the fallback without contacting upstream
+    clock.advance(currency.NEGATIVE_CACHE_TTL - 0.1)
+    assert asyncio.run(currency.get_rate_snapshot("EUR")).source == "fallback"
+    assert fake_upstream.requests == 1
+    assert currency.get_fetch_stats()["short_circuited"] == 1
+
+    fake_upstream.failure_rate = 0.0
+    clock.advance(0.1)
+    assert asyncio.run(currency.get_rate_snapshot("EUR")).source == "frankfurter"
+    assert fake_upstream.requests == 2
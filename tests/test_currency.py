@@ -0,0 +1,63 @@
+"""
+Checks of the coalesced (single-flight) exchange rate fetch.
+"""
+
+import asyncio
+
+import httpx
+
+import app.currency as currency
+
+
+WAITERS = 20
+
+
+async def _gather(coro, n: int = WAITERS) -> list:
+    return await asyncio.gather(*(coro() for _ in range(n)), return_exceptions=True)
+
+
+def test_concurrent_misses_share_one_fetch(fake_upstream):
+    snapshots = asyncio.run(_gather(lambda: currency.get_rate_snapshot("EUR")))
+
+    assert fake_upstream.requests == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    assert snapshots[0].source == "frankfurter"
+    stats = currency.get_fetch_stats()
+    assert stats["upstream_fetches"] == 1
+    assert stats["coalesced_waiters"] == WAITERS - 1
+    assert stats["in_flight"] == 0
+
+
+def test_concurrent_misses_share_one_error(fake_upstream):
+    fake_upstream.failure_rate = 1.0
+    errors = asyncio.run(_gather(lambda: currency._single_flight("EUR")))
+
+    assert fake_upstream.requests == 1
+    assert isinstance(errors[0], httpx.HTTPStatusError)
+    assert all(error is errors[0] for error in errors)
+    stats = currency.get_fetch_stats()
+    assert stats["upstream_errors"] == 1
+    assert stats["coalesced_waiters"] == WAITERS - 1
+
+
+def test_failed_fetch_falls_back_for_every_waiter(fake_upstream):
+    fake_upstream.failure_rate = 1.0
+    snapshots = asyncio.run(_gather(lambda: currency.get_rate_snapshot("EUR")))
+
+    assert fake_upstream.requests == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    assert snapshots[0].source == "fallback"
+
+
+def test_cancelled_waiter_does_not_cancel_the_fetch(fake_upstream):
+    async def run():
+        first = asyncio.ensure_future(currency._single_flight("EUR"))
+        second = asyncio.ensure_future(currency._single_flight("EUR"))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    snapshot = asyncio.run(run())
+
+    assert fake_upstream.requests == 1
+    assert currency._snapshots["EUR"] is snapshot
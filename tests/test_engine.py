@@ -0,0 +1,40 @@
+"""
+Checks of the vectorized cost engine against the scalar calculator.
+"""
+
+import random
+
+import pytest
+
+from app.calculator import calculate_total
+from app.engine import ANNUAL_ITEMS, ONE_TIME_ITEMS, calculate_batch
+from app.models import PropertyInput
+
+
+RATES = {"EUR": 1.0, "USD": 1.08, "CAD": 1.47, "GBP": 0.85, "AUD": 1.65}
+
+
+def test_batch_matches_calculator(random_options):
+    r = random.Random(1)
+    props = [
+        PropertyInput(
+            purchase_price=r.choice([50_000, 100_000, 250_000, r.uniform(1e4, 2e6)]),
+            **random_options(r),
+        )
+        for _ in range(3000)
+    ]
+    batch = calculate_batch(props)
+
+    for i, prop in enumerate(props):
+        result = calculate_total(prop, RATES)
+        one_time = {item.name: item.amount_eur for item in result.one_time_costs.items}
+        annual = {item.name: item.amount_eur for item in result.ongoing_annual_costs.items}
+        expected_one_time = [one_time.get(name, 0.0) for name in ONE_TIME_ITEMS]
+        expected_annual = [annual.get(name, 0.0) for name in ANNUAL_ITEMS]
+
+        assert batch.one_time[i] == pytest.approx(expected_one_time, abs=1e-6), prop
+        assert batch.annual[i] == pytest.approx(expected_annual, abs=1e-6), prop
+        assert batch.cadastral_value[i] == pytest.approx(result.cadastral_value, abs=1e-6)
+        assert batch.total_one_time[i] == pytest.approx(result.total_one_time_eur, abs=1e-6)
+        assert batch.total_annual[i] == pytest.approx(result.total_annual_eur, abs=1e-6)
+        assert batch.grand_total_first_year[i] == pytest.approx(result.grand_total_first_year_eur, abs=1e-6)
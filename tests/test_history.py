@@ -0,0 +1,59 @@
+"""
+Checks of the historical rate store: merging, saving and reloading.
+"""
+
+from datetime import date
+
+import numpy as np
+
+import app.history as history
+from app.history import RateHistory
+
+
+def store(rates: dict[str, dict[str, float]]) -> RateHistory:
+    return RateHistory.from_frankfurter([{"base": "EUR", "rates": rates}])
+
+
+def test_merge_keeps_currencies_missing_from_other():
+    old = store({"2024-01-02": {"USD": 1.09, "GBP": 0.86}, "2024-01-03": {"USD": 1.10, "GBP": 0.87}})
+    new = store({"2024-01-03": {"USD": 1.11}, "2024-01-04": {"USD": 1.12}})
+
+    merged = old.merge(new)
+
+    assert merged.currencies == ("GBP", "USD")
+    assert merged.dates.tolist() == [date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 4)]
+    np.testing.assert_array_equal(merged.column("USD"), [1.09, 1.11, 1.12])
+    np.testing.assert_array_equal(merged.column("GBP"), [0.86, 0.87, np.nan])
+
+
+def test_save_and_load_round_trip(tmp_path):
+    saved = store({"2024-01-02": {"USD": 1.09, "GBP": 0.86}, "2024-01-03": {"USD": 1.10}})
+    saved.save(tmp_path)
+
+    loaded = RateHistory.load(tmp_path)
+
+    assert loaded.currencies == saved.currencies
+    np.testing.assert_array_equal(loaded.dates, saved.dates)
+    np.testing.assert_array_equal(loaded.rates, saved.rates)
+
+
+def test_save_keeps_only_two_versions(tmp_path):
+    for day in range(1, 5):
+        store({f"2024-01-0{day}": {"USD": 1.0 + day}}).save(tmp_path)
+
+    assert len([p for p in tmp_path.iterdir() if p.is_dir()]) == 2
+    assert RateHistory.load(tmp_path).dates.tolist() == [date(2024, 1, 4)]
+
+
+def test_get_history_reloads_after_save(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_PATH", tmp_path)
+    monkeypatch.setattr(history, "_history", None)
+    assert len(history.get_history()) == 0
+
+    store({"2024-01-02": {"USD": 1.09}}).save(tmp_path)
+    first = history.get_history()
+    assert len(first) == 1
+    assert history.get_history() is first
+
+    store({"2024-01-02": {"USD": 1.09}, "2024-01-03": {"USD": 1.10}}).save(tmp_path)
+    assert len(history.get_history()) == 2
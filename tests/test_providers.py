@@ -0,0 +1,126 @@
+"""
+Checks of the rate providers: hedged requests against the fake
+Frankfurter server, and malformed upstream payloads.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.providers import (
+    FakeFrankfurter, FrankfurterProvider, HedgedProvider, ProviderError, RateProvider,
+)
+
+
+def fake_provider(name: str, latency_ms: float) -> tuple[FrankfurterProvider, FakeFrankfurter]:
+    transport = FakeFrankfurter(latency_ms=(latency_ms, latency_ms))
+    provider = FrankfurterProvider(client=httpx.AsyncClient(transport=transport))
+    provider.name = name
+    return provider, transport
+
+
+class SleepyProvider(RateProvider):
+    """Answers after a delay and remembers whether it was cancelled."""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__()
+        self.name = name
+        self.delay = delay
+        self.cancelled = False
+
+    async def _fetch(self, base: str) -> dict[str, float]:
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {base: 1.0, "USD": 1.0 if self.name == "backup" else 2.0}
+
+
+def test_hedges_only_when_primary_is_slower_than_percentile():
+    primary, primary_server = fake_provider("primary", 20)
+    backup, backup_server = fake_provider("backup", 0)
+    hedged = HedgedProvider(primary, backup, hedge_percentile=95, min_samples=5)
+
+    async def run():
+        # Warm up the primary's histogram: 20 ms answers land in the 50 ms bucket
+        for _ in range(5):
+            await hedged.fetch("EUR")
+        assert hedged.hedge_delay() == pytest.approx(0.05)
+        assert hedged.hedges == 0
+        assert backup_server.requests == 0
+
+        primary_server.latency_ms = (300, 300)
+        rates = await hedged.fetch("EUR")
+        assert rates["EUR"] == 1.0
+        assert hedged.hedges == 1
+        assert hedged.backup_wins == 1
+        assert backup_server.requests == 1
+
+    asyncio.run(run())
+
+    # Cancelled calls are left out of the histograms
+    assert primary.latency.count == 5
+    assert backup.latency.count == 1
+    assert hedged.latency.count == 6
+    assert primary.latency.percentile(50) == 50
+    stats = hedged.stats()
+    assert set(stats) == {"primary", "backup", hedged.name}
+    assert stats[hedged.name]["hedges"] == 1
+
+
+def test_first_answer_wins_and_loser_is_cancelled():
+    primary = SleepyProvider("primary", 1.0)
+    backup = SleepyProvider("backup", 0.01)
+    hedged = HedgedProvider(primary, backup, min_samples=1, initial_delay_ms=20)
+
+    rates = asyncio.run(hedged.fetch("EUR"))
+
+    assert rates["USD"] == 1.0
+    assert hedged.backup_wins == 1
+    assert primary.cancelled
+    assert not backup.cancelled
+
+
+def test_primary_can_still_win_after_hedging():
+    primary = SleepyProvider("primary", 0.05)
+    backup = SleepyProvider("backup", 1.0)
+    hedged = HedgedProvider(primary, backup, min_samples=1, initial_delay_ms=20)
+
+    rates = asyncio.run(hedged.fetch("EUR"))
+
+    assert rates["USD"] == 2.0
+    assert hedged.hedges == 1
+    assert hedged.backup_wins == 0
+    assert backup.cancelled
+
+
+def test_failed_primary_waits_for_backup():
+    primary, primary_server = fake_provider("primary", 0)
+    primary_server.failure_rate = 1.0
+    backup, _ = fake_provider("backup", 10)
+    hedged = HedgedProvider(primary, backup, min_samples=100, initial_delay_ms=1000)
+
+    rates = asyncio.run(hedged.fetch("EUR"))
+
+    assert rates["EUR"] == 1.0
+    assert hedged.backup_wins == 1
+    assert primary.latency.errors == 1
+
+
+@pytest.mark.parametrize("body", [
+    b"<html>Service unavailable</html>",
+    b"[]",
+    b"{}",
+    b'{"rates": []}',
+    b'{"rates": {"USD": "n/a"}}',
+    b'{"rates": {"USD": null}}',
+])
+def test_malformed_payload_raises_provider_error(body):
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+    provider = FrankfurterProvider(client=httpx.AsyncClient(transport=transport))
+
+    with pytest.raises(ProviderError):
+        asyncio.run(provider.fetch("EUR"))
+    assert provider.latency.errors == 1
@@ -0,0 +1,32 @@
+"""
+Checks of the budget solver against a brute-force search.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.models import PurchaseOptions
+from app.solver import all_in_cost, solve_max_price
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_solver_matches_brute_force(seed, random_options):
+    r = random.Random(seed)
+    options = PurchaseOptions(**random_options(r))
+    budgets = np.array([1_000.0, *(r.uniform(2e4, 6e5) for _ in range(9))])
+
+    # Every whole euro up to the largest budget
+    prices = np.arange(1.0, budgets.max() + 1)
+    costs = all_in_cost(options, prices)
+    solved = solve_max_price(options, budgets)
+
+    for budget, price in zip(budgets, solved):
+        fits = prices[costs <= budget]
+        if not len(fits):
+            assert np.isnan(price)
+            continue
+        # The solver is exact to the cent, the search to the euro
+        assert fits.max() <= price < fits.max() + 1
+        assert all_in_cost(options, np.array([price]))[0] <= budget